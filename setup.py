@@ -39,6 +39,9 @@ setuptools.setup(
         'java': [
             'jpype1 >= 1.1.2, == 1.*',
         ],
+        'numpy': [
+            'numpy',
+        ],
         'dev': [
             'gitignoreio',
         ],
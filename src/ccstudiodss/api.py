@@ -1,21 +1,21 @@
+import collections.abc
 import contextlib
 import enum
+import functools
 import os
 import pathlib
+import re
 import shutil
+import struct
 import subprocess
+import tempfile
+import threading
+import time
 
 import attr
-try:
-    import jpype
-except ImportError:
-    jpype = None
-
-if jpype is not None:
-    import jpype.imports
-
-import lxml.etree
 
+import ccstudiodss.installations
+import ccstudiodss.trace
 import ccstudiodss.utils
 
 
@@ -26,12 +26,21 @@ class BuildTypes(enum.Enum):
 
 
 def add_jars(base_path=None):
+    import jpype
+
     if base_path is None:
-        base_path = ccstudiodss.utils.find_base_path()
+        jars = ccstudiodss.installations.default().jars
+    else:
+        jars = jar_paths(base_path=base_path)
+
+    class_path = set(jpype.getClassPath().split(os.pathsep))
+
+    for jar in jars:
+        jar = ccstudiodss.utils.fspath(jar)
 
-    for jar in jar_paths(base_path=base_path):
-        if jar not in jpype.getClassPath().split(os.pathsep):
-            jpype.addClassPath(ccstudiodss.utils.fspath(jar))
+        if jar not in class_path:
+            jpype.addClassPath(jar)
+            class_path.add(jar)
 
 
 def join_path_lists(*path_lists):
@@ -43,151 +52,1988 @@ def join_path_lists(*path_lists):
     return s.strip(os.pathsep)
 
 
-relative_jar_paths = tuple(
-    pathlib.Path(path)
-    for path in (
-        'DebugServer/packages/ti/dss/java/dss.jar',
-        (
-            'DebugServer/packages/ti/dss/java/'
-            'com.ti.ccstudio.scripting.environment_3.1.0.jar'
-        ),
-        'DebugServer/packages/ti/dss/java/com.ti.debug.engine_1.0.0.jar',
-        'dvt/scripting/dvt_scripting.jar',
-    )
-)
+relative_jar_paths = ccstudiodss.installations.relative_jar_paths
+jar_paths = ccstudiodss.installations.jar_paths
 
 
-def jar_paths(base_path, relative=relative_jar_paths):
-    base_path = pathlib.Path(base_path)
-    return tuple(
-        base_path / path
-        for path in relative
-    )
+def start_jvm():
+    import jpype
+    # enables importing Java packages such as com.ti as Python modules
+    import jpype.imports
+
+    if not jpype.isJVMStarted():
+        with ccstudiodss.trace.span('start_jvm'):
+            jpype.startJVM()
+
+
+def stop_jvm():
+    import jpype
+
+    if jpype.isJVMStarted():
+        jpype.shutdownJVM()
+
+
+@attr.s
+class JpypeBackend:
+    """Run DSS in a JVM hosted through JPype."""
+
+    def start(self):
+        start_jvm()
+
+    def stop(self):
+        stop_jvm()
+
+    def attach_thread(self):
+        """Attach the calling thread to the JVM, if started, as a daemon.
+
+        JPype otherwise attaches threads on first use as non-daemon threads
+        which keep the JVM from shutting down.
+        """
+
+        import jpype
+
+        if jpype.isJVMStarted():
+            jpype.java.lang.Thread.attachAsDaemon()
+
+    def scripting_environment(self):
+        import com.ti.ccstudio.scripting.environment
+
+        return (
+            com.ti.ccstudio.scripting.environment.ScriptingEnvironment.instance()
+        )
+
+    def long_array(self, values):
+        import jpype
+
+        return jpype.JArray(jpype.JLong)(values)
+
+    def session_array(self, debug_sessions):
+        import jpype
+        import com.ti.debug.engine.scripting
+
+        return jpype.JArray(com.ti.debug.engine.scripting.DebugSession)(
+            debug_sessions,
+        )
+
+
+class ConnectionLostError(Exception):
+    pass
+
+
+def script_timeout(seconds):
+    """The DSS script timeout, in milliseconds, for seconds."""
+
+    return int(float(seconds) * 1000)
+
+
+def backoff_delays(initial, maximum, count):
+    """count delays doubling from initial and capped at maximum."""
+
+    return [min(initial * 2**index, maximum) for index in range(count)]
+
+
+def reconnecting(retry):
+    """Recover a dropped target connection around a Session method.
+
+    The connection is checked before the call and, if the call fails with
+    the target no longer connected, the session is reconnected.  With
+    retry the call is then repeated once, otherwise the error is raised
+    with the session ready for the next call.  Calls made from within
+    another decorated method, or before the session was ever connected,
+    are not checked.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if (
+                    not self.auto_reconnect
+                    or self.in_operation
+                    or self.debug_server is None
+            ):
+                return method(self, *args, **kwargs)
+
+            self.in_operation = True
+
+            try:
+                if not self.is_connected():
+                    self.reconnect()
+
+                try:
+                    return method(self, *args, **kwargs)
+                except Exception:
+                    if self.is_connected():
+                        raise
+
+                    self.reconnect()
+
+                    if not retry:
+                        raise
+
+                return method(self, *args, **kwargs)
+            finally:
+                self.in_operation = False
+
+        return wrapper
+
+    return decorator
 
 
 @attr.s
 class Session:
+    """A connected DSS debug session.
+
+    With auto_reconnect a dropped target connection is detected and the
+    debug session reopened through the existing debug server, retrying up
+    to reconnect_attempts times with delays doubling from reconnect_delay
+    seconds up to reconnect_max_delay.  The JVM keeps running throughout
+    since JPype can not start it again within the same process.
+    """
+
     ccxml = attr.ib()
     script = attr.ib(default=None)
     debug_server = attr.ib(default=None)
     debug_session = attr.ib(default=None)
     device_pattern = attr.ib(default='.*')
+    address_unit_bits = attr.ib(default=16)
+    binary = attr.ib(default=None)
+    backend = attr.ib(factory=JpypeBackend)
+    auto_reconnect = attr.ib(default=True)
+    reconnect_attempts = attr.ib(default=5)
+    reconnect_delay = attr.ib(default=0.5)
+    reconnect_max_delay = attr.ib(default=8)
+    environment = attr.ib(default=None, repr=False)
+    in_operation = attr.ib(default=False, init=False, repr=False)
+    symbol_cache = attr.ib(default=None, init=False, repr=False)
 
     def __enter__(self):
-        jpype.startJVM()
-        import com.ti.ccstudio.scripting.environment
+        self.backend.start()
 
         try:
-            self.script = (
-                com.ti.ccstudio.scripting.environment.ScriptingEnvironment.instance()
-            )
+            self.connect()
+        except:
+            self.backend.stop()
+
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close()
+        finally:
+            self.backend.stop()
+
+    def close(self):
+        """Disconnect and stop the debug server, leaving the backend running."""
+
+        try:
+            self.disconnect()
+        finally:
+            self.debug_server.stop()
+
+    def connect(self):
+        with ccstudiodss.trace.span('scripting_environment'):
+            self.script = self.backend.scripting_environment()
 
             self.debug_server = self.script.getServer("DebugServer.1")
+
+        with ccstudiodss.trace.span('set_config', ccxml=self.ccxml):
             self.debug_server.setConfig(ccstudiodss.utils.fspath(self.ccxml))
 
-            self.debug_session = self.debug_server.openSession(self.device_pattern)
+        self.open_session()
 
+    def open_session(self):
+        with ccstudiodss.trace.span(
+                'open_session',
+                device_pattern=self.device_pattern,
+        ):
+            self.debug_session = self.debug_server.openSession(
+                self.device_pattern,
+            )
+
+        with ccstudiodss.trace.span('connect'):
             self.debug_session.target.connect()
-        except:
-            jpype.shutdownJVM()
 
-            raise
+    def disconnect(self):
+        if self.debug_session is None:
+            return
 
-        return self
+        with ccstudiodss.trace.span('disconnect'):
+            try:
+                self.debug_session.target.disconnect()
+            finally:
+                self.debug_session.terminate()
+
+    def is_connected(self):
+        if self.debug_session is None:
+            return False
 
-    def __exit__(self, exc_type, exc_value, traceback):
         try:
-            self.debug_session.target.disconnect()
-            self.debug_server.stop()
-        finally:
-            jpype.shutdownJVM()
+            return bool(self.debug_session.target.isConnected())
+        except Exception:
+            return False
+
+    def terminate_session(self):
+        if self.debug_session is not None:
+            with contextlib.suppress(Exception):
+                self.debug_session.terminate()
+
+            self.debug_session = None
+
+    def reconnect(self):
+        """Reopen the debug session and connect to the target again.
+
+        The debug server, its configuration and the JVM are reused.  Symbols
+        of the last loaded binary are reloaded.  ConnectionLostError is
+        raised if every attempt fails.
+        """
+
+        delays = backoff_delays(
+            initial=self.reconnect_delay,
+            maximum=self.reconnect_max_delay,
+            count=self.reconnect_attempts - 1,
+        )
+        error = None
+
+        with ccstudiodss.trace.span('reconnect'):
+            for delay in [0, *delays]:
+                self.terminate_session()
+                time.sleep(delay)
+
+                try:
+                    self.open_session()
+
+                    if self.binary is not None:
+                        self.debug_session.symbol.load(
+                            ccstudiodss.utils.fspath(self.binary),
+                        )
+                except Exception as e:
+                    error = e
+                else:
+                    return
+
+        self.terminate_session()
+
+        raise ConnectionLostError(
+            'Unable to reconnect to {!r} after {} attempts'.format(
+                self.device_pattern,
+                self.reconnect_attempts,
+            ),
+        ) from error
 
     @contextlib.contextmanager
     def temporary_timeout(self, timeout):
+        if self.environment is not None:
+            # the script timeout is shared with the environment's sessions
+            with self.environment.temporary_timeout(timeout):
+                yield
+
+            return
+
         old_timeout = self.script.getScriptTimeout()
-        self.script.setScriptTimeout(timeout * 1000)
-        yield
-        self.script.setScriptTimeout(old_timeout)
+        self.script.setScriptTimeout(script_timeout(timeout))
+
+        try:
+            yield
+        finally:
+            self.script.setScriptTimeout(old_timeout)
+
+    @reconnecting(retry=True)
+    def read_region(self, region):
+        values = self.debug_session.memory.readData(
+            region.page,
+            region.address,
+            region.type_size,
+            region.count,
+        )
+
+        return [int(value) for value in values]
+
+    @reconnecting(retry=True)
+    def read_memory(
+            self,
+            address,
+            count,
+            page=0,
+            dtype='uint16',
+            block_size=0x10000,
+    ):
+        """Read count values into a NumPy array.
+
+        Values are transferred as unsigned integers of the dtype's width in
+        blocks of block_size values and reinterpreted as dtype, so floating
+        point and signed dtypes are supported.
+        """
+
+        import numpy
+
+        dtype = numpy.dtype(dtype)
+        unsigned = unsigned_dtype(dtype)
+        type_size = dtype.itemsize * 8
+        units_per_value = address_units(
+            bits=type_size,
+            address_unit_bits=self.address_unit_bits,
+        )
+
+        result = numpy.empty(count, dtype=unsigned)
+
+        for start in range(0, count, block_size):
+            values = self.debug_session.memory.readData(
+                page,
+                address + start * units_per_value,
+                type_size,
+                min(block_size, count - start),
+            )
+            # JPype exposes primitive arrays through the buffer protocol
+            # so this does not convert element by element
+            result[start:start + len(values)] = numpy.asarray(values)
+
+        return result.view(dtype)
+
+    @reconnecting(retry=True)
+    def write_memory(
+            self,
+            address,
+            data,
+            page=0,
+            dtype=None,
+            block_size=0x10000,
+    ):
+        """Write a NumPy array or buffer protocol object.
+
+        dtype selects the value width for objects that are not already NumPy
+        arrays and defaults to uint16.
+        """
+
+        import numpy
+
+        array = as_array(data, dtype=dtype)
+        type_size = array.dtype.itemsize * 8
+        units_per_value = address_units(
+            bits=type_size,
+            address_unit_bits=self.address_unit_bits,
+        )
+        values = array.view(unsigned_dtype(array.dtype)).astype(numpy.int64)
+
+        for start in range(0, len(values), block_size):
+            block = self.backend.long_array(values[start:start + block_size])
+            self.debug_session.memory.writeData(
+                page,
+                address + start * units_per_value,
+                block,
+                type_size,
+            )
+
+    def symbol_index(self):
+        """The symbol index of the loaded binary.
+
+        Assign the binary attribute when the target was loaded elsewhere.
+        The index is kept until the binary's path, modification time or
+        size changes.
+        """
+
+        import ccstudiodss.symbols
+
+        if self.binary is None:
+            raise SymbolError('No binary has been loaded')
+
+        path = os.path.abspath(ccstudiodss.utils.fspath(self.binary))
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+
+        if self.symbol_cache is None or self.symbol_cache[0] != key:
+            self.symbol_cache = (key, ccstudiodss.symbols.load(path))
+
+        return self.symbol_cache[1]
+
+    def resolve_variables(self, names, dtype='uint16'):
+        index = self.symbol_index()
 
-    def load(self, binary, timeout=150):
+        variables = []
+
+        for name in names:
+            symbol = index.get(name)
+            if symbol is None:
+                raise SymbolError('Symbol not found: {!r}'.format(name))
+
+            variables.append(Variable.from_symbol(
+                symbol=symbol,
+                dtype=dtype_for(dtype=dtype, name=name),
+                address_unit_bits=self.address_unit_bits,
+            ))
+
+        return variables
+
+    @reconnecting(retry=True)
+    def read_variables(self, names, dtype='uint16', page=0, max_gap=16):
+        """Read variables by name with as few memory reads as possible.
+
+        Variables no more than max_gap address units apart are read in a
+        single transaction.  dtype is either a single dtype or a mapping of
+        names to dtypes.  Symbol sizes are taken to be in bytes, addresses
+        in address units and target values little endian.  Single values
+        are returned as scalars and arrays as NumPy arrays.
+        """
+
+        variables = self.resolve_variables(names=names, dtype=dtype)
+        unit = unit_dtype(self.address_unit_bits)
+
+        results = {}
+
+        for block in coalesce(variables=variables, max_gap=max_gap):
+            start = block[0].start
+            units = self.read_memory(
+                address=start,
+                count=max(variable.end for variable in block) - start,
+                page=page,
+                dtype=unit,
+            )
+
+            for variable in block:
+                values = units[variable.start - start:variable.end - start]
+                values = values.view(variable.dtype)
+
+                if variable.count == 1:
+                    values = values[0]
+
+                results[variable.name] = values
+
+        return results
+
+    @reconnecting(retry=True)
+    def write_variables(self, values, dtype='uint16', page=0):
+        """Write variables by name, merging adjacent ones into one write.
+
+        values maps names to scalars or arrays.  See read_variables() for
+        the handling of dtype, sizes and byte order.
+        """
+
+        import numpy
+
+        variables = self.resolve_variables(names=list(values), dtype=dtype)
+        unit = unit_dtype(self.address_unit_bits)
+
+        for block in coalesce(variables=variables, max_gap=0):
+            start = block[0].start
+            units = numpy.empty(
+                max(variable.end for variable in block) - start,
+                dtype=unit,
+            )
+
+            for variable in block:
+                array = numpy.asarray(values[variable.name], dtype=variable.dtype)
+                array = numpy.broadcast_to(array.reshape(-1), (variable.count,))
+                # a broadcast scalar has zero strides and can not be viewed
+                # with a narrower dtype
+                units[variable.start - start:variable.end - start] = (
+                    numpy.ascontiguousarray(array).view(unit)
+                )
+
+            self.write_memory(address=start, data=units, page=page)
+
+    def is_loaded(self, binary_hash, ledger, region=None):
+        entry = ledger.get(ccxml=self.ccxml, device_pattern=self.device_pattern)
+
+        if entry is None or entry['binary_hash'] != binary_hash:
+            return False
+
+        if region is None:
+            return True
+
+        if entry.get('region') != attr.asdict(region):
+            return False
+
+        return self.read_region(region) == entry['values']
+
+    @reconnecting(retry=True)
+    def load(
+            self,
+            binary,
+            timeout=150,
+            ledger=None,
+            skip_if_loaded=False,
+            region=None,
+    ):
+        """Load the binary and restart the target.
+
+        When a ledger is passed the load is recorded in it.  With
+        skip_if_loaded the load is skipped and the target only restarted if
+        the ledger shows the same binary was last loaded, optionally
+        confirmed by reading back region.  Returns whether the binary was
+        loaded.
+        """
+
+        import ccstudiodss.ledger
+
+        if skip_if_loaded and ledger is None:
+            ledger = ccstudiodss.ledger.Ledger()
+
+        if ledger is not None:
+            binary_hash = ccstudiodss.utils.binary_hash(binary)
+
+            if skip_if_loaded and self.is_loaded(
+                    binary_hash=binary_hash,
+                    ledger=ledger,
+                    region=region,
+            ):
+                self.binary = binary
+                self.restart_target()
+
+                return False
+
+            ledger.forget(ccxml=self.ccxml, device_pattern=self.device_pattern)
+
+        self.load_program(binary=binary, timeout=timeout)
+
+        if ledger is not None:
+            ledger.record(
+                ccxml=self.ccxml,
+                device_pattern=self.device_pattern,
+                binary_hash=binary_hash,
+                region=region,
+                values=None if region is None else self.read_region(region),
+                sections=ccstudiodss.ledger.section_records(binary),
+            )
+
+        self.restart_target()
+
+        return True
+
+    @reconnecting(retry=True)
+    def load_program(self, binary, timeout=150):
         with self.temporary_timeout(timeout):
-            self.debug_session.memory.loadProgram(
-                ccstudiodss.utils.fspath(binary)
+            with ccstudiodss.trace.span('load_program', binary=binary):
+                self.debug_session.memory.loadProgram(
+                    ccstudiodss.utils.fspath(binary)
+                )
+
+        self.binary = binary
+
+    @reconnecting(retry=True)
+    def load_sections(
+            self,
+            binary,
+            timeout=150,
+            ledger=None,
+            page=0,
+            type_size=16,
+            verify=False,
+    ):
+        """Write only the loadable sections that changed since the last load.
+
+        Sections are compared against the hashes recorded in the ledger by
+        the previous load to this ccxml and device pattern.  With verify the
+        unchanged sections are also read back from the target and rewritten
+        if they differ.  Without a recorded baseline the whole program is
+        loaded.  Changed sections are written with plain memory writes and
+        read back.  If a section does not read back as written, such as one
+        in flash, the whole program is loaded instead so the ledger only
+        records what the target holds.
+
+        Sections are written at their load addresses within the program
+        segments, where loadProgram puts them, rather than at their run
+        addresses.  A section outside of the loadable segments also causes
+        the whole program to be loaded.
+        """
+
+        import ccstudiodss.elf
+        import ccstudiodss.ledger
+
+        if ledger is None:
+            ledger = ccstudiodss.ledger.Ledger()
+
+        binary_hash = ccstudiodss.utils.binary_hash(binary)
+        entry = ledger.get(ccxml=self.ccxml, device_pattern=self.device_pattern)
+
+        if entry is None:
+            previous = None
+        else:
+            previous = entry.get('sections')
+
+        ledger.forget(ccxml=self.ccxml, device_pattern=self.device_pattern)
+
+        written = []
+        skipped = []
+        records = {}
+
+        with ccstudiodss.elf.open_elf(binary) as elf:
+            value_format = '{}{{}}{}'.format(
+                elf.byte_order,
+                {8: 'B', 16: 'H', 32: 'I'}[type_size],
             )
+            value_bytes = type_size // 8
+
+            sections = elf.loadable_sections()
+
+            for section in sections:
+                data = elf.section_data(section)
+                record = ccstudiodss.ledger.section_record(
+                    section=section,
+                    data=data,
+                )
+                records[section.name] = record
+
+                if previous is None:
+                    continue
+
+                address = section_load_address(
+                    elf=elf,
+                    section=section,
+                    address_unit_bits=self.address_unit_bits,
+                )
+
+                if address is None:
+                    previous = None
+                    continue
+
+                padding = -len(data) % value_bytes
+                data += b'\x00' * padding
+                values = struct.unpack(
+                    value_format.format(len(data) // value_bytes),
+                    data,
+                )
+
+                region = ccstudiodss.ledger.Region(
+                    address=address,
+                    count=len(values),
+                    page=page,
+                    type_size=type_size,
+                )
+
+                if previous.get(section.name) == record:
+                    if not verify:
+                        skipped.append(section)
+                        continue
+
+                    if self.read_region(region) == list(values):
+                        skipped.append(section)
+                        continue
+
+                written.append(section)
+
+                with self.temporary_timeout(timeout):
+                    self.debug_session.memory.writeData(
+                        page,
+                        address,
+                        self.backend.long_array(values),
+                        type_size,
+                    )
+
+                if self.read_region(region) != list(values):
+                    # memory writes do not program flash, load it all
+                    previous = None
+
+        if previous is None:
+            self.load_program(binary=binary, timeout=timeout)
+            written = sections
+            skipped = []
+        else:
+            self.debug_session.symbol.load(ccstudiodss.utils.fspath(binary))
+            self.binary = binary
 
-        self.debug_session.target.restart()
+        ledger.record(
+            ccxml=self.ccxml,
+            device_pattern=self.device_pattern,
+            binary_hash=binary_hash,
+            sections=records,
+        )
+
+        self.restart_target()
+
+        return SectionLoad(
+            written=[section.name for section in written],
+            skipped=[section.name for section in skipped],
+            bytes_written=sum(section.size for section in written),
+            bytes_skipped=sum(section.size for section in skipped),
+            full=previous is None,
+        )
 
+    @reconnecting(retry=True)
+    def restart_target(self):
+        with ccstudiodss.trace.span('restart'):
+            self.debug_session.target.restart()
+
+    @reconnecting(retry=False)
     def run(self):
         self.debug_session.target.runAsynch()
 
-    def restart(self):
+    @reconnecting(retry=False)
+    def wait_for_halt(self, timeout=None):
+        """Block until the target halts.
+
+        DSS returns as soon as it is notified of the halt.  With timeout,
+        in seconds, the DSS script timeout error is raised if the target has
+        not halted in time.
+        """
+
+        with ccstudiodss.trace.span('wait_for_halt'):
+            if timeout is None:
+                self.debug_session.target.waitForHalt()
+            else:
+                with self.temporary_timeout(timeout):
+                    self.debug_session.target.waitForHalt()
+
+    def resolve_location(self, location):
+        """The address of location, either an address or a symbol name."""
+
+        if not isinstance(location, str):
+            return location
+
+        symbol = self.symbol_index().get(location)
+        if symbol is None:
+            raise SymbolError('Symbol not found: {!r}'.format(location))
+
+        return symbol.address
+
+    @reconnecting(retry=False)
+    def run_until(self, location, timeout=None):
+        """Run until location, an address or symbol name, is reached.
+
+        A breakpoint is set at location for the duration of the run and
+        this returns as soon as the target halts, whether at location or
+        elsewhere.  If the wait fails, such as after timeout seconds, the
+        target is halted before the error is raised.
+        """
+
+        address = self.resolve_location(location)
+        breakpoint = self.debug_session.breakpoint.add(address)
+
+        try:
+            with ccstudiodss.trace.span('run_until', location=location):
+                self.run()
+
+                try:
+                    self.wait_for_halt(timeout=timeout)
+                except:
+                    self.debug_session.target.halt()
+
+                    raise
+        finally:
+            self.debug_session.breakpoint.remove(breakpoint)
+
+    @reconnecting(retry=True)
+    def reset(self):
         self.debug_session.target.reset()
-        self.debug_session.target.runAsynch()
 
+    @reconnecting(retry=False)
+    def restart(self):
+        self.reset()
+        self.run()
 
-def build(target, build_type, project_root, project_name, suffix=None):
-    if project_name is None:
-        project_name = pathlib.Path(project_root).parts[-1]
 
-    workspace = ccstudiodss.utils.generated_workspace_path(
-        project_root=project_root,
-        suffix=suffix,
-    )
+class SimultaneousError(Exception):
+    pass
 
-    workspace.mkdir(parents=True, exist_ok=True)
 
-    base_command = (
-        ccstudiodss.utils.fspath(ccstudiodss.utils.find_executable()),
-        '-noSplash',
-        '-data', ccstudiodss.utils.fspath(workspace),
-    )
+@attr.s
+class Environment:
+    """One DSS scripting environment shared by several sessions.
 
-    if not any(True for _ in workspace.iterdir()):
-        subprocess.run(
-            [
-                *base_command,
-                '-application', 'com.ti.ccstudio.apps.projectImport',
-                '-ccs.location', ccstudiodss.utils.fspath(project_root),
-                '-ccs.renameTo', project_name,
-            ],
-            check=True,
-        )
-
-    subprocess.run(
-        [
-            *base_command,
-            '-application', 'com.ti.ccstudio.apps.projectBuild',
-            '-ccs.projects', project_name,
-            '-ccs.configuration', target,
-            '-ccs.buildType', build_type.name,
-        ],
-        check=True,
-    )
+    The JVM is started on entry and stopped on exit.  In between any number
+    of sessions can be opened, on several cores of one ccxml or on several
+    ccxml files, without the sessions owning the JVM.  Each ccxml is
+    configured on its own debug server.  The DSS script timeout is shared
+    so while operations with timeouts overlap the longest applies.
+
+        with Environment() as environment:
+            cpu1 = environment.session(ccxml=ccxml, device_pattern='.*CPU1')
+            cpu2 = environment.session(ccxml=ccxml, device_pattern='.*CPU2')
+            environment.load([(cpu1, cpu1_binary), (cpu2, cpu2_binary)])
+            environment.run([cpu1, cpu2])
+    """
 
-    return pathlib.Path(project_root)/target/(project_name + '.out')
+    backend = attr.ib(factory=JpypeBackend)
+    script = attr.ib(default=None)
+    debug_servers = attr.ib(factory=dict)
+    sessions = attr.ib(factory=list)
+    lock = attr.ib(factory=threading.RLock, repr=False)
+    timeouts = attr.ib(factory=list, repr=False)
+    saved_timeout = attr.ib(default=None, repr=False)
 
+    def __enter__(self):
+        self.open()
 
-def remove_generated_directory(project_root, suffix=None):
-    path = ccstudiodss.utils.generated_project_root(
-        project_root=project_root,
-        suffix=suffix,
-    )
-    shutil.rmtree(ccstudiodss.utils.fspath(path))
+        return self
 
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-def remove_generated_directories():
-    path = ccstudiodss.utils.generated_path_root()
-    shutil.rmtree(ccstudiodss.utils.fspath(path))
+    def open(self):
+        self.backend.start()
 
+        try:
+            with ccstudiodss.trace.span('scripting_environment'):
+                self.script = self.backend.scripting_environment()
+        except:
+            self.backend.stop()
 
-def get_cproject_targets_from_path(path):
-    with open(path) as f:
-        return get_cproject_targets(f)
+            raise
 
+    def close(self):
+        try:
+            self.close_sessions()
+        finally:
+            self.script = None
+            self.backend.stop()
 
-def get_cproject_targets(file):
-    tree = lxml.etree.parse(file)
-    targets = tree.xpath(
-        '//storageModule[@moduleId="org.eclipse.cdt.core.settings"]/@name',
+    @contextlib.contextmanager
+    def temporary_timeout(self, timeout):
+        """Apply a script timeout, in seconds, for the duration.
+
+        Overlapping uses from several threads are counted.  The original
+        timeout is saved by the first and restored by the last, and in
+        between the longest requested timeout is in effect.
+        """
+
+        timeout = float(timeout)
+
+        with self.lock:
+            if len(self.timeouts) == 0:
+                self.saved_timeout = self.script.getScriptTimeout()
+
+            self.timeouts.append(timeout)
+            self.script.setScriptTimeout(script_timeout(max(self.timeouts)))
+
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.timeouts.remove(timeout)
+
+                if len(self.timeouts) == 0:
+                    self.script.setScriptTimeout(self.saved_timeout)
+                    self.saved_timeout = None
+                else:
+                    self.script.setScriptTimeout(
+                        script_timeout(max(self.timeouts)),
+                    )
+
+    def debug_server(self, ccxml):
+        """The debug server configured for ccxml, created on first use."""
+
+        key = os.path.abspath(ccstudiodss.utils.fspath(ccxml))
+
+        with self.lock:
+            debug_server = self.debug_servers.get(key)
+
+            if debug_server is None:
+                name = 'DebugServer.{}'.format(len(self.debug_servers) + 1)
+
+                debug_server = self.script.getServer(name)
+
+                with ccstudiodss.trace.span('set_config', ccxml=ccxml):
+                    debug_server.setConfig(key)
+
+                self.debug_servers[key] = debug_server
+
+            return debug_server
+
+    def session(self, ccxml, device_pattern='.*', **kwargs):
+        """Open and connect a Session for the matching core of ccxml.
+
+        Further keyword arguments are passed to Session.
+        """
+
+        with self.lock:
+            session = Session(
+                ccxml=ccxml,
+                device_pattern=device_pattern,
+                backend=self.backend,
+                script=self.script,
+                debug_server=self.debug_server(ccxml),
+                environment=self,
+                **kwargs,
+            )
+            session.open_session()
+            self.sessions.append(session)
+
+        return session
+
+    def release(self, session):
+        """Disconnect a session opened by session()."""
+
+        with self.lock:
+            self.sessions = [
+                other for other in self.sessions if other is not session
+            ]
+
+        session.disconnect()
+
+    def close_sessions(self):
+        """Disconnect all sessions and stop the debug servers."""
+
+        with self.lock:
+            sessions, self.sessions = self.sessions, []
+            debug_servers, self.debug_servers = self.debug_servers, {}
+
+        try:
+            for session in sessions:
+                session.disconnect()
+        finally:
+            for debug_server in debug_servers.values():
+                debug_server.stop()
+
+    def parallel(self, calls, jobs=None):
+        """Call each of calls concurrently and return their results.
+
+        All calls complete before the first error, if any, is raised.
+        """
+
+        import concurrent.futures
+
+        calls = list(calls)
+
+        if len(calls) == 0:
+            return []
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(calls) if jobs is None else jobs,
+                thread_name_prefix='ccstudiodss',
+                initializer=self.backend.attach_thread,
+        ) as executor:
+            futures = [executor.submit(call) for call in calls]
+
+        return [future.result() for future in futures]
+
+    def load(self, loads, jobs=None, timeout=150, **kwargs):
+        """Load (session, binary) pairs in parallel.
+
+        timeout, in seconds, is applied once for the whole group.  Further
+        keyword arguments are passed to Session.load() and the results are
+        returned in the order of loads.
+        """
+
+        with self.temporary_timeout(timeout):
+            return self.parallel(
+                calls=[
+                    functools.partial(
+                        session.load,
+                        binary=binary,
+                        timeout=timeout,
+                        **kwargs
+                    )
+                    for session, binary in loads
+                ],
+                jobs=jobs,
+            )
+
+    def simultaneous(self, sessions):
+        """The DSS simultaneous controller and session array for sessions."""
+
+        debug_servers = {id(session.debug_server) for session in sessions}
+
+        if len(debug_servers) != 1:
+            raise SimultaneousError(
+                'Simultaneous operations require sessions of a single ccxml',
+            )
+
+        for session in sessions:
+            if session.auto_reconnect and not session.is_connected():
+                session.reconnect()
+
+        return (
+            sessions[0].debug_server.simultaneous,
+            self.backend.session_array(
+                [session.debug_session for session in sessions],
+            ),
+        )
+
+    def run(self, sessions):
+        """Start the targets of sessions running together."""
+
+        simultaneous, debug_sessions = self.simultaneous(sessions)
+
+        with ccstudiodss.trace.span('simultaneous_run'):
+            simultaneous.run(debug_sessions)
+
+    def halt(self, sessions):
+        """Halt the targets of sessions together."""
+
+        simultaneous, debug_sessions = self.simultaneous(sessions)
+
+        with ccstudiodss.trace.span('simultaneous_halt'):
+            simultaneous.halt(debug_sessions)
+
+    def wait_for_halt(self, sessions, timeout=None):
+        """Block until the targets of all sessions have halted.
+
+        timeout, in seconds, applies to the wait as a whole.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        for session in sessions:
+            if deadline is None:
+                session.wait_for_halt()
+            else:
+                session.wait_for_halt(
+                    timeout=max(deadline - time.monotonic(), 0.001),
+                )
+
+
+class SymbolError(Exception):
+    pass
+
+
+class AddressUnitError(Exception):
+    pass
+
+
+def address_units(bits, address_unit_bits):
+    """The number of address units spanned by a bits wide value."""
+
+    if bits % address_unit_bits != 0:
+        raise AddressUnitError(
+            '{} bit values are not addressable with {} bit address'
+            ' units'.format(bits, address_unit_bits),
+        )
+
+    return bits // address_unit_bits
+
+
+def section_load_address(elf, section, address_unit_bits):
+    """Where the program loader writes section, None if it does not.
+
+    The address is within the physical addresses of the loadable segment
+    holding the section, which differ from the section address for
+    sections copied to their run address at startup.
+    """
+
+    segment = elf.containing_segment(section)
+
+    if segment is None:
+        return None
+
+    offset_bits = (section.offset - segment.offset) * 8
+
+    if offset_bits % address_unit_bits != 0:
+        return None
+
+    return segment.physical_address + offset_bits // address_unit_bits
+
+
+@attr.s(frozen=True)
+class Variable:
+    name = attr.ib()
+    dtype = attr.ib()
+    count = attr.ib()
+    start = attr.ib()
+    end = attr.ib()
+
+    @classmethod
+    def from_symbol(cls, symbol, dtype, address_unit_bits):
+        import numpy
+
+        dtype = numpy.dtype(dtype).newbyteorder('<')
+        units_per_value = address_units(
+            bits=dtype.itemsize * 8,
+            address_unit_bits=address_unit_bits,
+        )
+
+        if symbol.size == 0:
+            count = 1
+        elif symbol.size % dtype.itemsize != 0:
+            raise SymbolError(
+                '{!r} is {} bytes, not a whole number of {} byte'
+                ' values'.format(symbol.name, symbol.size, dtype.itemsize),
+            )
+        else:
+            count = symbol.size // dtype.itemsize
+
+        return cls(
+            name=symbol.name,
+            dtype=dtype,
+            count=count,
+            start=symbol.address,
+            end=symbol.address + count * units_per_value,
+        )
+
+
+def dtype_for(dtype, name):
+    if isinstance(dtype, collections.abc.Mapping):
+        return dtype[name]
+
+    return dtype
+
+
+def unit_dtype(address_unit_bits):
+    import numpy
+
+    return numpy.dtype('<u{}'.format(address_unit_bits // 8))
+
+
+def coalesce(variables, max_gap):
+    """Group variables sorted by address into runs at most max_gap apart."""
+
+    block = []
+    end = None
+
+    for variable in sorted(variables, key=lambda variable: variable.start):
+        if end is not None and variable.start - end > max_gap:
+            yield block
+            block = []
+            end = None
+
+        block.append(variable)
+        end = variable.end if end is None else max(end, variable.end)
+
+    if len(block) > 0:
+        yield block
+
+
+def unsigned_dtype(dtype):
+    import numpy
+
+    return numpy.dtype('u{}'.format(numpy.dtype(dtype).itemsize)).newbyteorder(
+        numpy.dtype(dtype).byteorder,
+    )
+
+
+def as_array(data, dtype=None):
+    import numpy
+
+    if isinstance(data, numpy.ndarray):
+        array = data if dtype is None else data.astype(dtype, copy=False)
+    else:
+        if dtype is None:
+            dtype = 'uint16'
+
+        try:
+            array = numpy.frombuffer(data, dtype=dtype)
+        except TypeError:
+            array = numpy.asarray(data, dtype=dtype)
+
+    return numpy.ascontiguousarray(array).reshape(-1)
+
+
+@attr.s(frozen=True)
+class SectionLoad:
+    written = attr.ib()
+    skipped = attr.ib()
+    bytes_written = attr.ib()
+    bytes_skipped = attr.ib()
+    full = attr.ib()
+
+
+@attr.s(frozen=True)
+class BuildOutputs:
+    """The artifact of a build and the files produced with it.
+
+    outputs holds the artifact and its companions such as the .map and .hex
+    files that exist.  The object is path-like and refers to the artifact
+    so it can be used where build() used to return a path.
+    """
+
+    artifact = attr.ib(converter=pathlib.Path)
+    outputs = attr.ib(converter=tuple, default=())
+
+    def __fspath__(self):
+        return ccstudiodss.utils.fspath(self.artifact)
+
+    @classmethod
+    def from_configuration(cls, configuration, project_root, project_name):
+        paths = configuration.outputs(
+            project_root=project_root,
+            project_name=project_name,
+        )
+
+        return cls(
+            artifact=paths[0],
+            outputs=(path for path in paths if path.is_file()),
+        )
+
+
+def output_directory_names(project_root, project_name, configurations):
+    """The top level project directories holding configuration outputs."""
+
+    project_root = pathlib.Path(project_root)
+    names = set()
+
+    for configuration in configurations:
+        directory = configuration.output_directory(
+            project_root=project_root,
+            project_name=project_name,
+        )
+
+        try:
+            relative = directory.relative_to(project_root)
+        except ValueError:
+            continue
+
+        if len(relative.parts) > 0:
+            names.add(relative.parts[0])
+
+    return sorted(names)
+
+
+def build(
+        target,
+        build_type,
+        project_root,
+        project_name,
+        suffix=None,
+        output=None,
+        cache=None,
+        pool_size=None,
+        use_makefiles=False,
+        make_jobs=None,
+        on_diagnostic=None,
+        fail_fast=False,
+        references=(),
+        dependencies=(),
+):
+    """Build a target of the project, returning its BuildOutputs.
+
+    The artifact location is taken from the target's configuration in the
+    .cproject file.  The build runs in a workspace leased from the
+    project's pool, see ccstudiodss.workspaces.lease(), so concurrent
+    builds are safe.  With use_makefiles the makefiles CCS generated for
+    the target are run directly with gmake unless the project settings or
+    layout changed since they were generated, in which case Eclipse is used
+    to regenerate them.
+
+    Build output is streamed line by line to output, or stdout when None,
+    and compiler, linker and make diagnostics are passed to on_diagnostic
+    as they arrive.  With fail_fast the build is stopped at the first error
+    and ccstudiodss.diagnostics.BuildError raised.
+
+    references are ccstudiodss.project.Project instances imported into the
+    build workspace before the project so workspace locations referring to
+    them resolve.  dependencies are files the build consumes from outside
+    the project, such as the outputs of the referenced projects, and are
+    included in the cache key.
+    """
+
+    import ccstudiodss.cache
+    import ccstudiodss.cproject
+    import ccstudiodss.make
+
+    if project_name is None:
+        project_name = pathlib.Path(project_root).parts[-1]
+
+    configuration = ccstudiodss.cproject.find_in_project(
+        project_root=project_root,
+        name=target,
+    )
+    artifact = configuration.artifact(
+        project_root=project_root,
+        project_name=project_name,
+    )
+    # where CCS generates the makefiles as well
+    output_directory = configuration.output_directory(
+        project_root=project_root,
+        project_name=project_name,
+    )
+
+    def outputs():
+        return BuildOutputs.from_configuration(
+            configuration=configuration,
+            project_root=project_root,
+            project_name=project_name,
+        )
+
+    if build_type is BuildTypes.clean:
+        cache = None
+
+    installation = ccstudiodss.installations.default()
+
+    if cache is not None or use_makefiles:
+        try:
+            configurations = ccstudiodss.cproject.read_project(project_root)
+        except OSError:
+            configurations = ()
+
+        # the target itself is included for when the .cproject does not
+        # list it and the defaults are assumed
+        excluded_directories = sorted({
+            target,
+            *ccstudiodss.cproject.configuration_names(configurations),
+            *output_directory_names(
+                project_root=project_root,
+                project_name=project_name,
+                configurations=[*configurations, configuration],
+            ),
+        })
+
+    if cache is not None:
+        with ccstudiodss.trace.span('cache_key', target=target):
+            cache_key = ccstudiodss.cache.key(
+                project_root=project_root,
+                project_name=project_name,
+                target=target,
+                build_type=build_type,
+                base_path=installation.base_path,
+                excluded_directories=excluded_directories,
+                dependencies=dependencies,
+            )
+
+        with ccstudiodss.trace.span('cache_restore', target=target):
+            restored = cache.restore(key=cache_key, destination=artifact.parent)
+
+        if restored:
+            return outputs()
+
+    if use_makefiles and ccstudiodss.make.makefiles_current(
+            project_root=project_root,
+            build_directory=output_directory,
+            excluded_directories=excluded_directories,
+    ):
+        with ccstudiodss.trace.span('make', target=target):
+            ccstudiodss.make.build(
+                build_directory=output_directory,
+                build_type=build_type,
+                base_path=installation.base_path,
+                jobs=make_jobs,
+                output=output,
+                on_diagnostic=on_diagnostic,
+                fail_fast=fail_fast,
+            )
+    else:
+        build_with_eclipse(
+            target=target,
+            build_type=build_type,
+            project_root=project_root,
+            project_name=project_name,
+            installation=installation,
+            suffix=suffix,
+            output=output,
+            pool_size=pool_size,
+            on_diagnostic=on_diagnostic,
+            fail_fast=fail_fast,
+            references=references,
+        )
+
+    result = outputs()
+
+    if cache is not None:
+        with ccstudiodss.trace.span('cache_store', target=target):
+            cache.store(key=cache_key, paths=result.outputs)
+
+    return result
+
+
+def build_with_eclipse(
+        target,
+        build_type,
+        project_root,
+        project_name,
+        installation,
+        suffix=None,
+        output=None,
+        pool_size=None,
+        on_diagnostic=None,
+        fail_fast=False,
+        references=(),
+):
+    import ccstudiodss.diagnostics
+    import ccstudiodss.workspaces
+
+    with ccstudiodss.workspaces.lease(
+            project_root=project_root,
+            suffix=suffix,
+            size=pool_size,
+    ) as slot:
+        base_command = (
+            ccstudiodss.utils.fspath(installation.require_executable()),
+            '-noSplash',
+            '-data', ccstudiodss.utils.fspath(slot.workspace),
+        )
+
+        imports = [
+            *((reference.name, reference.root) for reference in references),
+            (project_name, project_root),
+        ]
+
+        for name, root in imports:
+            if slot.imported(project_name=name):
+                continue
+
+            with ccstudiodss.trace.span('project_import', project=name):
+                ccstudiodss.diagnostics.run(
+                    [
+                        *base_command,
+                        '-application', 'com.ti.ccstudio.apps.projectImport',
+                        '-ccs.location', ccstudiodss.utils.fspath(root),
+                        '-ccs.renameTo', name,
+                    ],
+                    output=output,
+                )
+            slot.mark_imported(project_name=name)
+
+        with ccstudiodss.trace.span('project_build', target=target):
+            ccstudiodss.diagnostics.run(
+                [
+                    *base_command,
+                    '-application', 'com.ti.ccstudio.apps.projectBuild',
+                    '-ccs.projects', project_name,
+                    '-ccs.configuration', target,
+                    '-ccs.buildType', build_type.name,
+                ],
+                output=output,
+                on_diagnostic=on_diagnostic,
+                fail_fast=fail_fast,
+            )
+
+
+@attr.s(frozen=True)
+class TargetBuild:
+    target = attr.ib()
+    artifact = attr.ib(default=None)
+    output = attr.ib(default=b'')
+    error = attr.ib(default=None)
+    diagnostics = attr.ib(default=(), converter=tuple)
+    log = attr.ib(default=None)
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+def build_errors():
+    """The exception types reporting a failed build rather than a bug."""
+
+    import ccstudiodss.make
+    import ccstudiodss.workspaces
+
+    return (
+        subprocess.CalledProcessError,
+        ccstudiodss.utils.BasePathError,
+        ccstudiodss.utils.ExecutablePathError,
+        ccstudiodss.make.MakePathError,
+        ccstudiodss.workspaces.WorkspaceTimeoutError,
+        OSError,
+    )
+
+
+def open_log(log_directory, name):
+    """A binary file for build output and its path, None when temporary."""
+
+    if log_directory is None:
+        return tempfile.TemporaryFile(), None
+
+    log_directory = pathlib.Path(log_directory)
+    log_directory.mkdir(parents=True, exist_ok=True)
+    log = log_directory / (name + '.log')
+
+    return open(log, 'w+b'), log
+
+
+def build_captured(target, log_directory=None, log_name=None, **kwargs):
+    """Run build() capturing its output and diagnostics in a TargetBuild.
+
+    The output is kept in log_directory/<log_name>.log when a log
+    directory is given, log_name defaulting to the target.  Any exception
+    raised by the build is recorded as the error so one target can not end
+    a run of several.
+    """
+
+    diagnostics = []
+    output, log = open_log(
+        log_directory=log_directory,
+        name=target if log_name is None else log_name,
+    )
+
+    with output:
+        try:
+            artifact = build(
+                target=target,
+                output=output,
+                on_diagnostic=diagnostics.append,
+                **kwargs
+            )
+        except Exception as e:
+            artifact = None
+            error = e
+        else:
+            error = None
+
+        output.seek(0)
+
+        return TargetBuild(
+            target=target,
+            artifact=artifact,
+            output=output.read(),
+            error=error,
+            diagnostics=diagnostics,
+            log=log,
+        )
+
+
+def build_targets(
+        targets,
+        build_type,
+        project_root,
+        project_name,
+        suffix=None,
+        jobs=1,
+        cache=None,
+        use_makefiles=False,
+        make_jobs=None,
+        fail_fast=False,
+        log_directory=None,
+):
+    """Build several targets concurrently, yielding results as they finish.
+
+    Each build leases its own workspace from the project's pool.  Output is
+    captured per target rather than written to the console, in
+    log_directory/<target>.log when a log directory is given.  With
+    fail_fast each build stops at its first error and targets not yet
+    started when a build fails are cancelled.
+    """
+
+    import ccstudiodss.workspaces
+
+    import concurrent.futures
+
+    pool_size = max(jobs, ccstudiodss.workspaces.default_size())
+
+    def build_target(target):
+        return build_captured(
+            target=target,
+            log_directory=log_directory,
+            build_type=build_type,
+            project_root=project_root,
+            project_name=project_name,
+            suffix=suffix,
+            cache=cache,
+            pool_size=pool_size,
+            use_makefiles=use_makefiles,
+            make_jobs=make_jobs,
+            fail_fast=fail_fast,
+        )
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(build_target, target): target
+            for target in targets
+        }
+
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                yield TargetBuild(
+                    target=futures[future],
+                    error=concurrent.futures.CancelledError(),
+                )
+
+                continue
+
+            result = future.result()
+
+            if fail_fast and not result.succeeded:
+                for pending in futures:
+                    pending.cancel()
+
+            yield result
+
+
+class DependencyFailedError(Exception):
+    pass
+
+
+@attr.s(frozen=True)
+class ProjectBuild:
+    project = attr.ib()
+    build = attr.ib()
+
+    @property
+    def succeeded(self):
+        return self.build.succeeded
+
+
+def build_projects(
+        project_roots,
+        target,
+        build_type,
+        search_paths=(),
+        suffix=None,
+        jobs=1,
+        cache=None,
+        use_makefiles=False,
+        make_jobs=None,
+        fail_fast=False,
+        log_directory=None,
+):
+    """Build projects and those they reference in dependency order.
+
+    References are read from the .project files, see
+    ccstudiodss.project.dependency_graph().  Each project is built once
+    all the projects it references have been and up to jobs projects are
+    built concurrently.  Projects depending on a failed build are not built
+    and reported with a DependencyFailedError.  With fail_fast nothing new
+    is started after a failure.  The same target is built in every
+    project.  Each project's build workspace also imports the projects it
+    references, directly or not, and their outputs are part of its cache
+    key so dependents are rebuilt when a referenced project changes.
+    Yields a ProjectBuild for each project as it finishes.
+    """
+
+    import ccstudiodss.project
+    import ccstudiodss.workspaces
+
+    import concurrent.futures
+
+    projects = ccstudiodss.project.dependency_graph(
+        project_roots=project_roots,
+        search_paths=search_paths,
+    )
+    order = ccstudiodss.project.topological_order(projects)
+
+    waiting = {
+        name: set(projects[name].references)
+        for name in order
+    }
+    dependents = {name: [] for name in order}
+    for name in order:
+        for reference in projects[name].references:
+            dependents[reference].append(name)
+
+    pool_size = max(jobs, ccstudiodss.workspaces.default_size())
+
+    outputs = {}
+
+    def build_project(project):
+        import ccstudiodss.project
+
+        references = ccstudiodss.project.referenced_projects(
+            projects=projects,
+            name=project.name,
+        )
+
+        return ProjectBuild(
+            project=project,
+            build=build_captured(
+                target=target,
+                log_directory=log_directory,
+                log_name='{}-{}'.format(project.name, target),
+                build_type=build_type,
+                project_root=project.root,
+                project_name=project.name,
+                suffix=suffix,
+                cache=cache,
+                pool_size=pool_size,
+                use_makefiles=use_makefiles,
+                make_jobs=make_jobs,
+                fail_fast=fail_fast,
+                references=references,
+                dependencies=[
+                    path
+                    for reference in references
+                    for path in outputs[reference.name]
+                ],
+            ),
+        )
+
+    def not_built(name, error):
+        return ProjectBuild(
+            project=projects[name],
+            build=TargetBuild(target=target, error=error),
+        )
+
+    failed = False
+    running = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        while True:
+            if not (fail_fast and failed):
+                for name in order:
+                    if name in waiting and len(waiting[name]) == 0:
+                        del waiting[name]
+                        future = executor.submit(build_project, projects[name])
+                        running[future] = name
+
+            if len(running) == 0:
+                break
+
+            done, _ = concurrent.futures.wait(
+                running,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+
+                yield result
+
+                if result.succeeded:
+                    outputs[name] = result.build.artifact.outputs
+
+                    for dependent in dependents[name]:
+                        if dependent in waiting:
+                            waiting[dependent].discard(name)
+
+                    continue
+
+                failed = True
+                blocked = list(dependents[name])
+
+                while len(blocked) > 0:
+                    dependent = blocked.pop()
+
+                    if waiting.pop(dependent, None) is None:
+                        continue
+
+                    blocked.extend(dependents[dependent])
+
+                    yield not_built(
+                        name=dependent,
+                        error=DependencyFailedError(
+                            '{} depends on {} which failed'.format(
+                                dependent,
+                                name,
+                            ),
+                        ),
+                    )
+
+        for name in order:
+            if name in waiting:
+                yield not_built(
+                    name=name,
+                    error=concurrent.futures.CancelledError(),
+                )
+
+
+headless_build_banner = re.compile(
+    r'^\*\*\*\* (?:Clean-only build|Build) of configuration'
+    r' (?P<target>.+) for project (?P<project>.+) \*\*\*\*$',
+)
+
+headless_build_options = {
+    BuildTypes.incremental: '-build',
+    BuildTypes.full: '-cleanBuild',
+}
+
+
+@attr.s(frozen=True)
+class ConfigurationBuild:
+    project_root = attr.ib()
+    project_name = attr.ib()
+    target = attr.ib()
+    artifact = attr.ib()
+    succeeded = attr.ib()
+    output = attr.ib()
+    diagnostics = attr.ib(default=(), converter=tuple)
+
+
+def split_headless_build_output(lines):
+    """Group output lines by the (project, target) build they belong to."""
+
+    sections = {}
+    section = sections.setdefault(None, [])
+
+    for line in lines:
+        match = headless_build_banner.match(line)
+        if match is not None:
+            section = sections.setdefault(
+                (match.group('project'), match.group('target')),
+                [],
+            )
+
+        section.append(line)
+
+    return sections
+
+
+def imported_in_workspace(workspace, project_name):
+    return (
+        pathlib.Path(workspace)
+        / '.metadata' / '.plugins' / 'org.eclipse.core.resources' / '.projects'
+        / project_name
+    ).is_dir()
+
+
+def artifact_mtime(outputs):
+    try:
+        return outputs.artifact.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def build_configurations(
+        configurations,
+        build_type,
+        suffix=None,
+        project_names=None,
+):
+    """Build several configurations of several projects in one Eclipse run.
+
+    configurations is an iterable of (project_root, target) pairs.  The
+    projects are imported and built with the CDT headless build application
+    so Eclipse starts only once.  Eclipse is given the names from the
+    .project files.  Artifacts are named as by build(), from project_names
+    mapping project roots to names or else the project directory names.
+    Returns a ConfigurationBuild for each requested pair.
+
+    A configuration succeeded when its build reported no errors and left
+    an artifact written by this run.  An untouched artifact is accepted
+    only for incremental builds where Eclipse exited successfully.
+    """
+
+    import ccstudiodss.cproject
+    import ccstudiodss.diagnostics
+    import ccstudiodss.project
+    import ccstudiodss.workspaces
+
+    if build_type not in headless_build_options:
+        raise ValueError(
+            '{} builds are not supported in a single Eclipse run'.format(
+                build_type.name,
+            ),
+        )
+
+    configurations = [
+        (pathlib.Path(project_root), target)
+        for project_root, target in configurations
+    ]
+    project_roots = sorted({project_root for project_root, _ in configurations})
+    eclipse_names = {
+        project_root: ccstudiodss.project.read_name(project_root)
+        for project_root in project_roots
+    }
+    artifact_names = {
+        project_root: project_root.parts[-1]
+        for project_root in project_roots
+    }
+
+    if project_names is not None:
+        artifact_names.update(
+            (pathlib.Path(project_root), name)
+            for project_root, name in project_names.items()
+        )
+
+    def outputs_for(project_root, target):
+        return BuildOutputs.from_configuration(
+            configuration=ccstudiodss.cproject.find_in_project(
+                project_root=project_root,
+                name=target,
+            ),
+            project_root=project_root,
+            project_name=artifact_names[project_root],
+        )
+
+    previous_mtimes = {
+        (project_root, target): artifact_mtime(
+            outputs_for(project_root=project_root, target=target),
+        )
+        for project_root, target in configurations
+    }
+
+    with ccstudiodss.workspaces.lease(
+            project_root=os.pathsep.join(
+                ccstudiodss.utils.fspath(project_root)
+                for project_root in project_roots
+            ),
+            suffix=suffix,
+    ) as slot:
+        command = [
+            ccstudiodss.utils.fspath(
+                ccstudiodss.installations.default().require_executable(),
+            ),
+            '-noSplash',
+            '-data', ccstudiodss.utils.fspath(slot.workspace),
+            '-application', 'org.eclipse.cdt.managedbuilder.core.headlessbuild',
+        ]
+
+        for project_root in project_roots:
+            if not imported_in_workspace(
+                    slot.workspace,
+                    eclipse_names[project_root],
+            ):
+                command.extend([
+                    '-import',
+                    ccstudiodss.utils.fspath(project_root),
+                ])
+
+        for project_root, target in configurations:
+            command.extend([
+                headless_build_options[build_type],
+                '{}/{}'.format(
+                    re.escape(eclipse_names[project_root]),
+                    re.escape(target),
+                ),
+            ])
+
+        with ccstudiodss.trace.span('headless_build'):
+            process = subprocess.run(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+
+    sections = split_headless_build_output(
+        process.stdout.decode('utf-8', errors='replace').splitlines(),
+    )
+
+    results = []
+
+    for project_root, target in configurations:
+        outputs = outputs_for(project_root=project_root, target=target)
+        lines = sections.get((eclipse_names[project_root], target))
+
+        if lines is None:
+            diagnostics = []
+        else:
+            diagnostics = [
+                diagnostic
+                for diagnostic in map(ccstudiodss.diagnostics.parse_line, lines)
+                if diagnostic is not None
+            ]
+
+        mtime = artifact_mtime(outputs)
+        written = (
+            mtime is not None
+            and mtime != previous_mtimes[(project_root, target)]
+        )
+        untouched_and_current = (
+            mtime is not None
+            and build_type == BuildTypes.incremental
+            and process.returncode == 0
+        )
+
+        succeeded = (
+            lines is not None
+            and not any(diagnostic.error for diagnostic in diagnostics)
+            and (written or untouched_and_current)
+        )
+
+        results.append(ConfigurationBuild(
+            project_root=project_root,
+            project_name=artifact_names[project_root],
+            target=target,
+            artifact=outputs if succeeded else None,
+            succeeded=succeeded,
+            output='\n'.join(sections[None] if lines is None else lines),
+            diagnostics=diagnostics,
+        ))
+
+    return results
+
+
+def remove_generated_directory(project_root, suffix=None):
+    path = ccstudiodss.utils.generated_project_root(
+        project_root=project_root,
+        suffix=suffix,
+    )
+    shutil.rmtree(ccstudiodss.utils.fspath(path))
+
+
+def remove_generated_directories():
+    path = ccstudiodss.utils.generated_path_root()
+    shutil.rmtree(ccstudiodss.utils.fspath(path))
+
+
+def get_cproject_targets_from_path(path):
+    import ccstudiodss.cproject
+
+    return ccstudiodss.cproject.configuration_names(
+        ccstudiodss.cproject.read(path),
+    )
+
+
+def get_cproject_targets(file):
+    import ccstudiodss.cproject
+
+    return ccstudiodss.cproject.configuration_names(
+        ccstudiodss.cproject.parse(file),
     )
-    return targets
@@ -0,0 +1,137 @@
+import asyncio
+import concurrent.futures
+import functools
+
+import attr
+
+import ccstudiodss.api
+
+
+@attr.s
+class AsyncSession:
+    """Awaitable access to a Session.
+
+    All calls into the session run on a single dedicated thread so they are
+    serialized as DSS expects while the event loop stays free for other
+    I/O.  Entering the async context starts the backend on the calling
+    thread and connects on the session thread.  Exiting disconnects on the
+    session thread and stops the backend on the calling thread since JPype
+    only shuts the JVM down from the main thread.
+
+        async with AsyncSession(Session(ccxml=ccxml)) as session:
+            await session.load(binary=binary)
+            await session.run()
+            await session.wait_for_halt()
+    """
+
+    session = attr.ib()
+    executor = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix='ccstudiodss',
+                initializer=self.session.backend.attach_thread,
+            )
+
+    @classmethod
+    def create(cls, *args, **kwargs):
+        """Create an AsyncSession for Session(*args, **kwargs)."""
+
+        return cls(session=ccstudiodss.api.Session(*args, **kwargs))
+
+    async def call(self, function, *args, **kwargs):
+        """Call function on the session thread and await the result."""
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(function, *args, **kwargs),
+        )
+
+    async def __aenter__(self):
+        self.session.backend.start()
+
+        try:
+            await self.call(self.session.connect)
+        except:
+            try:
+                self.close(wait=True)
+            finally:
+                self.session.backend.stop()
+
+            raise
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            await self.call(self.session.close)
+        finally:
+            try:
+                self.close(wait=True)
+            finally:
+                self.session.backend.stop()
+
+    def close(self, wait=False):
+        self.executor.shutdown(wait=wait)
+
+    async def connect(self):
+        return await self.call(self.session.connect)
+
+    async def disconnect(self):
+        return await self.call(self.session.disconnect)
+
+    async def is_connected(self):
+        return await self.call(self.session.is_connected)
+
+    async def reconnect(self):
+        return await self.call(self.session.reconnect)
+
+    async def load(self, *args, **kwargs):
+        return await self.call(self.session.load, *args, **kwargs)
+
+    async def load_program(self, *args, **kwargs):
+        return await self.call(self.session.load_program, *args, **kwargs)
+
+    async def load_sections(self, *args, **kwargs):
+        return await self.call(self.session.load_sections, *args, **kwargs)
+
+    async def run(self):
+        return await self.call(self.session.run)
+
+    async def reset(self):
+        return await self.call(self.session.reset)
+
+    async def restart(self):
+        return await self.call(self.session.restart)
+
+    async def restart_target(self):
+        return await self.call(self.session.restart_target)
+
+    async def wait_for_halt(self, timeout=None):
+        return await self.call(self.session.wait_for_halt, timeout=timeout)
+
+    async def run_until(self, location, timeout=None):
+        return await self.call(
+            self.session.run_until,
+            location,
+            timeout=timeout,
+        )
+
+    async def read_region(self, region):
+        return await self.call(self.session.read_region, region)
+
+    async def read_memory(self, *args, **kwargs):
+        return await self.call(self.session.read_memory, *args, **kwargs)
+
+    async def write_memory(self, *args, **kwargs):
+        return await self.call(self.session.write_memory, *args, **kwargs)
+
+    async def read_variables(self, *args, **kwargs):
+        return await self.call(self.session.read_variables, *args, **kwargs)
+
+    async def write_variables(self, *args, **kwargs):
+        return await self.call(self.session.write_variables, *args, **kwargs)
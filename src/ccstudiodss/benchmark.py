@@ -0,0 +1,606 @@
+"""Benchmarks of the Python side overhead.
+
+Sessions run against ccstudiodss.standin and builds against a fake Eclipse
+executable so no CCS install or hardware is needed.  With the default zero
+latencies the timings are the overhead of ccstudiodss itself.
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import pathlib
+import platform
+import statistics
+import struct
+import sys
+import tempfile
+import time
+
+import attr
+
+import ccstudiodss
+import ccstudiodss.api
+import ccstudiodss.cache
+import ccstudiodss.elf
+import ccstudiodss.installations
+import ccstudiodss.ledger
+import ccstudiodss.standin
+import ccstudiodss.utils
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+@attr.s(frozen=True)
+class Benchmark:
+    name = attr.ib()
+    setup = attr.ib()
+
+
+benchmarks = []
+
+
+def register(setup):
+    """Register a context manager function yielding the callable to time."""
+
+    benchmarks.append(Benchmark(
+        name=setup.__name__,
+        setup=contextlib.contextmanager(setup),
+    ))
+
+    return setup
+
+
+@attr.s(frozen=True)
+class Result:
+    name = attr.ib()
+    times = attr.ib(converter=tuple)
+    skipped = attr.ib(default=None)
+
+    @property
+    def minimum(self):
+        return min(self.times)
+
+    @property
+    def median(self):
+        return statistics.median(self.times)
+
+    def to_json(self):
+        if self.skipped is not None:
+            return {'name': self.name, 'skipped': self.skipped}
+
+        return {
+            'name': self.name,
+            'times': list(self.times),
+            'min': self.minimum,
+            'median': self.median,
+        }
+
+
+def run(names=None, repeat=10, latencies=None):
+    """Run the benchmarks, yielding a Result for each."""
+
+    if latencies is None:
+        latencies = ccstudiodss.standin.Latencies()
+
+    for benchmark in benchmarks:
+        if names is not None and benchmark.name not in names:
+            continue
+
+        times = []
+
+        with tempfile.TemporaryDirectory() as directory:
+            try:
+                with benchmark.setup(
+                        directory=pathlib.Path(directory),
+                        latencies=latencies,
+                ) as function:
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        function()
+                        times.append(time.perf_counter() - start)
+            except BenchmarkSkipped as e:
+                yield Result(name=benchmark.name, times=(), skipped=str(e))
+                continue
+
+        yield Result(name=benchmark.name, times=times)
+
+
+def metadata():
+    return {
+        'version': ccstudiodss.__version__,
+        'python': sys.version,
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def write_results(path, results):
+    with open(ccstudiodss.utils.fspath(path), 'w') as f:
+        json.dump(
+            {
+                'metadata': metadata(),
+                'results': [result.to_json() for result in results],
+            },
+            f,
+            indent=4,
+        )
+
+
+def write_elf(path, sections, symbols=()):
+    """Write a minimal little endian ELF32 file.
+
+    sections is a sequence of (name, address, data) tuples written as
+    allocated PROGBITS sections, each in a loadable segment of its own at
+    the same physical address, and symbols a sequence of (name, address,
+    size) tuples written as global objects.
+    """
+
+    header_size = 52
+    program_header_size = 32
+    section_header_size = 40
+    data_offset = header_size + len(sections) * program_header_size
+    symbol_size = 16
+
+    names = bytearray(b'\x00')
+    symbol_table = bytearray(symbol_size)
+    for name, address, size in symbols:
+        symbol_table += struct.pack(
+            '<IIIBBH',
+            len(names),
+            address,
+            size,
+            ccstudiodss.elf.STB_GLOBAL << 4 | ccstudiodss.elf.STT_OBJECT,
+            0,
+            1,
+        )
+        names += name.encode('utf-8') + b'\x00'
+
+    # (name, type, flags, address, data, link, info, entry size)
+    specifications = [
+        (name, 1, ccstudiodss.elf.SHF_ALLOC, address, data, 0, 0, 0)
+        for name, address, data in sections
+    ]
+    specifications.append(('.shstrtab', 3, 0, 0, None, 0, 0, 0))
+
+    if len(symbols) > 0:
+        specifications.append((
+            '.symtab',
+            ccstudiodss.elf.SHT_SYMTAB,
+            0,
+            0,
+            bytes(symbol_table),
+            # the following .strtab, after the null section and this one
+            len(specifications) + 2,
+            # index of the first global symbol
+            1,
+            symbol_size,
+        ))
+        specifications.append(('.strtab', 3, 0, 0, bytes(names), 0, 0, 0))
+
+    section_names = bytearray(b'\x00')
+    name_offsets = []
+    for specification in specifications:
+        name_offsets.append(len(section_names))
+        section_names += specification[0].encode('utf-8') + b'\x00'
+
+    body = bytearray()
+    program_headers = []
+    headers = [struct.pack('<10I', *[0] * 10)]
+    for (
+            (_, type_, flags, address, data, link, info, entry_size),
+            name_offset,
+    ) in zip(specifications, name_offsets):
+        if data is None:
+            data = section_names
+
+        if flags & ccstudiodss.elf.SHF_ALLOC != 0:
+            program_headers.append(struct.pack(
+                '<8I',
+                ccstudiodss.elf.PT_LOAD,
+                data_offset + len(body),
+                address,
+                address,
+                len(data),
+                len(data),
+                0,
+                1,
+            ))
+
+        headers.append(struct.pack(
+            '<10I',
+            name_offset,
+            type_,
+            flags,
+            address,
+            data_offset + len(body),
+            len(data),
+            link,
+            info,
+            1,
+            entry_size,
+        ))
+        body += data
+
+    body += b'\x00' * (-len(body) % 4)
+
+    identification = b'\x7fELF\x01\x01\x01' + b'\x00' * 9
+    header = identification + struct.pack(
+        '<HHIIIIIHHHHHH',
+        2,  # ET_EXEC
+        0,
+        1,
+        0,
+        header_size,
+        data_offset + len(body),
+        0,
+        header_size,
+        program_header_size,
+        len(program_headers),
+        section_header_size,
+        len(headers),
+        len(sections) + 1,
+    )
+
+    with open(ccstudiodss.utils.fspath(path), 'wb') as f:
+        f.write(header)
+        f.write(b''.join(program_headers))
+        f.write(body)
+        f.write(b''.join(headers))
+
+
+def write_binary(path, size=0x10000, seed=0, symbols=()):
+    """Write an ELF with a code and a data section of size bytes each."""
+
+    data = bytes((index * 7 + seed) & 0xff for index in range(size))
+
+    write_elf(
+        path=path,
+        sections=(
+            ('.text', 0x8000, data),
+            ('.data', 0x8000 + size, bytes(reversed(data))),
+        ),
+        symbols=symbols,
+    )
+
+
+@contextlib.contextmanager
+def open_session(directory, latencies):
+    ccxml = directory / 'target.ccxml'
+    ccxml.touch()
+
+    session = ccstudiodss.api.Session(
+        ccxml=ccxml,
+        backend=ccstudiodss.standin.StandInBackend(latencies=latencies),
+    )
+
+    with session:
+        yield session
+
+
+def require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise BenchmarkSkipped('NumPy is not installed') from None
+
+    return numpy
+
+
+@register
+def session_open_close(directory, latencies):
+    ccxml = directory / 'target.ccxml'
+    ccxml.touch()
+
+    def open_close():
+        session = ccstudiodss.api.Session(
+            ccxml=ccxml,
+            backend=ccstudiodss.standin.StandInBackend(latencies=latencies),
+        )
+
+        with session:
+            pass
+
+    yield open_close
+
+
+@register
+def load(directory, latencies):
+    binary = directory / 'program.out'
+    write_binary(binary)
+    ledger = ccstudiodss.ledger.Ledger(path=directory / 'ledger.json')
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        yield lambda: session.load(binary=binary, ledger=ledger)
+
+
+@register
+def load_skip_if_loaded(directory, latencies):
+    binary = directory / 'program.out'
+    write_binary(binary)
+    ledger = ccstudiodss.ledger.Ledger(path=directory / 'ledger.json')
+    region = ccstudiodss.ledger.Region(address=0x8000)
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        session.load(binary=binary, ledger=ledger, region=region)
+
+        yield lambda: session.load(
+            binary=binary,
+            ledger=ledger,
+            skip_if_loaded=True,
+            region=region,
+        )
+
+
+@register
+def load_sections_differential(directory, latencies):
+    binaries = [directory / 'first.out', directory / 'second.out']
+    write_binary(binaries[0], seed=0)
+    write_binary(binaries[1], seed=1)
+    ledger = ccstudiodss.ledger.Ledger(path=directory / 'ledger.json')
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        session.load_sections(binary=binaries[0], ledger=ledger)
+
+        def load_next():
+            binaries.reverse()
+            session.load_sections(binary=binaries[0], ledger=ledger)
+
+        yield load_next
+
+
+bulk_count = 0x40000
+
+
+@register
+def memory_read(directory, latencies):
+    require_numpy()
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        yield lambda: session.read_memory(address=0x8000, count=bulk_count)
+
+
+@register
+def memory_write(directory, latencies):
+    numpy = require_numpy()
+    data = numpy.arange(bulk_count, dtype=numpy.uint16)
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        yield lambda: session.write_memory(address=0x8000, data=data)
+
+
+@register
+def variables_read(directory, latencies):
+    require_numpy()
+
+    names = ['variable_{}'.format(index) for index in range(100)]
+    binary = directory / 'program.out'
+    write_binary(
+        binary,
+        symbols=[
+            (name, 0x8000 + 2 * position, 2)
+            for position, name in enumerate(names)
+        ],
+    )
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        session.load_program(binary=binary)
+
+        yield lambda: session.read_variables(names=names)
+
+
+@register
+def run_until(directory, latencies):
+    binary = directory / 'program.out'
+    write_binary(binary, symbols=[('done', 0x8000, 2)])
+
+    with open_session(directory=directory, latencies=latencies) as session:
+        session.load_program(binary=binary)
+
+        yield lambda: session.run_until('done', timeout=10)
+
+
+@register
+def load_cores_parallel(directory, latencies):
+    ccxml = directory / 'target.ccxml'
+    ccxml.touch()
+    binaries = [directory / 'cpu1.out', directory / 'cpu2.out']
+    write_binary(binaries[0], seed=0)
+    write_binary(binaries[1], seed=1)
+
+    environment = ccstudiodss.api.Environment(
+        backend=ccstudiodss.standin.StandInBackend(latencies=latencies),
+    )
+
+    with environment:
+        sessions = [
+            environment.session(ccxml=ccxml, device_pattern=device_pattern)
+            for device_pattern in ('.*CPU1', '.*CPU2')
+        ]
+
+        yield lambda: environment.load(list(zip(sessions, binaries)))
+
+
+fake_eclipse = '''\
+#!{executable}
+import json
+import pathlib
+import sys
+
+arguments = sys.argv[1:]
+
+def value(name):
+    return arguments[arguments.index(name) + 1]
+
+projects = pathlib.Path(value('-data')) / 'projects.json'
+application = value('-application')
+
+imported = json.loads(projects.read_text()) if projects.exists() else {{}}
+
+if application.endswith('.projectImport'):
+    imported[value('-ccs.renameTo')] = value('-ccs.location')
+    projects.write_text(json.dumps(imported))
+elif application.endswith('.projectBuild'):
+    name = value('-ccs.projects')
+    root = pathlib.Path(imported[name])
+    output = root / value('-ccs.configuration')
+    output.mkdir(exist_ok=True)
+    # the artifact changes with the sources like a real one would
+    (output / (name + '.out')).write_bytes((root / 'main.c').read_bytes())
+    (output / (name + '.map')).write_bytes(b'')
+'''
+
+
+def write_fake_installation(root):
+    """Write an installation whose Eclipse executable only creates outputs."""
+
+    base_path = root / 'ccs' / 'ccs_base'
+    base_path.mkdir(parents=True)
+
+    executable = root / 'ccs' / 'eclipse' / 'ccstudio'
+    executable.parent.mkdir()
+    executable.write_text(fake_eclipse.format(executable=sys.executable))
+    executable.chmod(0o755)
+
+    return base_path
+
+
+fake_cproject = '''\
+<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<?fileVersion 4.0.0?><cproject storage_type_id="org.eclipse.cdt.core.XmlProjectDescriptionStorage">
+	<storageModule moduleId="org.eclipse.cdt.core.settings">
+{configurations}	</storageModule>
+	<storageModule moduleId="cdtBuildSystem" version="4.0.0"/>
+</cproject>
+'''
+
+fake_cconfiguration = '''\
+		<cconfiguration id="com.ti.ccstudio.buildDefinitions.C2000.{index}">
+			<storageModule buildSystemId="org.eclipse.cdt.managedbuilder.core.configurationDataProvider" id="com.ti.ccstudio.buildDefinitions.C2000.{index}" moduleId="org.eclipse.cdt.core.settings" name="{name}"/>
+			<storageModule moduleId="cdtBuildSystem" version="4.0.0">
+				<configuration artifactExtension="out" artifactName="${{ProjName}}" buildProperties="" id="com.ti.ccstudio.buildDefinitions.C2000.{index}" name="{name}">
+					<folderInfo id="com.ti.ccstudio.buildDefinitions.C2000.{index}." name="/" resourcePath="">
+						<toolChain id="com.ti.ccstudio.buildDefinitions.C2000_18.1.exe.DebugToolchain.{index}" name="TI Build Tools">
+							<builder buildPath="${{BuildDirectory}}" id="com.ti.ccstudio.buildDefinitions.C2000_18.1.exe.builderDebug.{index}" name="GNU Make.{name}"/>
+						</toolChain>
+					</folderInfo>
+				</configuration>
+			</storageModule>
+		</cconfiguration>
+'''
+
+
+def write_fake_project(root, name, configurations):
+    root.mkdir(parents=True)
+
+    (root / '.project').write_text(
+        '<projectDescription><name>{}</name></projectDescription>'.format(name),
+    )
+    (root / '.cproject').write_text(fake_cproject.format(
+        configurations=''.join(
+            fake_cconfiguration.format(name=configuration, index=index)
+            for index, configuration in enumerate(configurations)
+        ),
+    ))
+    (root / 'main.c').write_text('int main(void) { return 0; }\n')
+
+
+@contextlib.contextmanager
+def environment_variable(name, value):
+    previous = os.environ.get(name)
+    os.environ[name] = value
+
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[name]
+        else:
+            os.environ[name] = previous
+
+
+@contextlib.contextmanager
+def fake_build_environment(directory, configurations):
+    if sys.platform == 'win32':
+        raise BenchmarkSkipped('The fake Eclipse executable is POSIX only')
+
+    base_path = write_fake_installation(directory / 'installation')
+    project_root = directory / 'project'
+    write_fake_project(
+        root=project_root,
+        name='benchmark',
+        configurations=configurations,
+    )
+
+    try:
+        with environment_variable(
+                ccstudiodss.installations.base_path_variable,
+                ccstudiodss.utils.fspath(base_path),
+        ):
+            yield project_root
+    finally:
+        ccstudiodss.api.remove_generated_directory(project_root=project_root)
+
+
+@register
+def build(directory, latencies):
+    with fake_build_environment(
+            directory=directory,
+            configurations=['Debug'],
+    ) as project_root:
+        yield lambda: ccstudiodss.api.build(
+            target='Debug',
+            build_type=ccstudiodss.api.BuildTypes.incremental,
+            project_root=project_root,
+            project_name='benchmark',
+        )
+
+
+@register
+def build_targets(directory, latencies):
+    configurations = ['Debug', 'Release', 'Test', 'Profile']
+
+    with fake_build_environment(
+            directory=directory,
+            configurations=configurations,
+    ) as project_root:
+        def build_all():
+            results = list(ccstudiodss.api.build_targets(
+                targets=configurations,
+                build_type=ccstudiodss.api.BuildTypes.incremental,
+                project_root=project_root,
+                project_name='benchmark',
+                jobs=len(configurations),
+            ))
+
+            for result in results:
+                if not result.succeeded:
+                    raise result.error
+
+        yield build_all
+
+
+@register
+def build_cached(directory, latencies):
+    with fake_build_environment(
+            directory=directory,
+            configurations=['Debug'],
+    ) as project_root:
+        cache = ccstudiodss.cache.DirectoryStore(path=directory / 'cache')
+
+        def cached_build():
+            return ccstudiodss.api.build(
+                target='Debug',
+                build_type=ccstudiodss.api.BuildTypes.incremental,
+                project_root=project_root,
+                project_name='benchmark',
+                cache=cache,
+            )
+
+        cached_build()
+
+        yield cached_build
@@ -0,0 +1,496 @@
+import hashlib
+import os
+import pathlib
+import re
+import shutil
+import tarfile
+import tempfile
+import time
+
+import attr
+
+import ccstudiodss.installations
+import ccstudiodss.utils
+
+
+# bump when the key calculation or entry layout changes
+key_version = 2
+
+key_pattern = re.compile(r'^[0-9a-f]{64}$')
+
+def default_path():
+    return ccstudiodss.utils.generated_path_root() / 'cache'
+
+
+def project_files(project_root, excluded_directories=()):
+    """Yield the input files of a project in a stable order.
+
+    The files are those found by ccstudiodss.utils.walk_project().
+    """
+
+    for directory, file_names in ccstudiodss.utils.walk_project(
+            project_root=project_root,
+            excluded_directories=excluded_directories,
+    ):
+        for name in file_names:
+            yield directory / name
+
+
+def installation_identity(base_path):
+    """Values identifying the CCS installation in cache keys.
+
+    The CCS version is used when known so machines with the same version
+    installed in different locations share entries.
+    """
+
+    version = ccstudiodss.installations.read_version(base_path)
+
+    if version is not None:
+        return ('version', version)
+
+    base_path = pathlib.Path(base_path)
+
+    return (
+        ccstudiodss.utils.fspath(base_path.resolve()),
+        base_path.stat().st_mtime_ns,
+    )
+
+
+def key(
+        project_root,
+        project_name,
+        target,
+        build_type,
+        base_path,
+        excluded_directories=(),
+        dependencies=(),
+):
+    """The cache key of a project build.
+
+    dependencies are files outside the project the build consumes, such as
+    the outputs of referenced projects, and are hashed by name and content.
+    """
+
+    hasher = hashlib.sha256()
+
+    def update(value):
+        encoded = str(value).encode('utf-8')
+        hasher.update(len(encoded).to_bytes(8, 'little'))
+        hasher.update(encoded)
+
+    for value in (
+            key_version,
+            project_name,
+            target,
+            build_type.name,
+            *installation_identity(base_path),
+    ):
+        update(value)
+
+    project_root = pathlib.Path(project_root)
+
+    for path in project_files(
+            project_root=project_root,
+            excluded_directories=excluded_directories,
+    ):
+        update(path.relative_to(project_root).as_posix())
+        hasher.update(ccstudiodss.utils.file_hash(path))
+
+    for path in dependencies:
+        update(pathlib.Path(path).name)
+        hasher.update(ccstudiodss.utils.file_hash(path))
+
+    return hasher.hexdigest()
+
+
+def check_key(key):
+    if key_pattern.match(key) is None:
+        raise ValueError('Invalid cache key: {!r}'.format(key))
+
+    return key
+
+
+@attr.s(frozen=True)
+class Entry:
+    path = attr.ib()
+    size = attr.ib()
+    last_used = attr.ib()
+
+
+def select_evictions(entries, max_size=None, max_age=None, now=None):
+    """The entries to remove, least recently used first.
+
+    Entries unused for more than max_age seconds are removed and then the
+    least recently used until the rest total no more than max_size bytes.
+    """
+
+    if now is None:
+        now = time.time()
+
+    entries = sorted(entries, key=lambda entry: entry.last_used)
+    total = sum(entry.size for entry in entries)
+    evicted = []
+
+    for entry in entries:
+        expired = max_age is not None and now - entry.last_used > max_age
+        oversized = max_size is not None and total > max_size
+
+        if not (expired or oversized):
+            break
+
+        evicted.append(entry)
+        total -= entry.size
+
+    return evicted
+
+
+def directory_size(path):
+    return sum(
+        child.stat().st_size
+        for child in pathlib.Path(path).rglob('*')
+        if child.is_file()
+    )
+
+
+def remove(path):
+    """Remove a file or directory tree, ignoring it having gone already.
+
+    Directories are first renamed aside so no partial entry is visible.
+    """
+
+    path = pathlib.Path(path)
+
+    if path.is_dir():
+        aside = path.with_name(
+            '.evicted-{}-{}'.format(path.name, os.urandom(4).hex()),
+        )
+
+        try:
+            os.replace(
+                ccstudiodss.utils.fspath(path),
+                ccstudiodss.utils.fspath(aside),
+            )
+        except FileNotFoundError:
+            return
+
+        shutil.rmtree(ccstudiodss.utils.fspath(aside), ignore_errors=True)
+    else:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def pack(paths, archive):
+    """Write the files to archive, a binary file, as a gzipped tar."""
+
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar:
+        for path in paths:
+            path = pathlib.Path(path)
+            tar.add(ccstudiodss.utils.fspath(path), arcname=path.name)
+
+
+def unpack(archive, destination):
+    """Extract the files of a pack() archive into destination.
+
+    Only plain files without directory components are accepted and each is
+    written to a temporary file and renamed into place.
+    """
+
+    destination = pathlib.Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+
+    restored = []
+
+    with tarfile.open(fileobj=archive, mode='r:gz') as tar:
+        for member in tar:
+            if (
+                    not member.isfile()
+                    or os.path.basename(member.name) != member.name
+            ):
+                raise ValueError(
+                    'Unexpected cache archive member: {!r}'.format(member.name),
+                )
+
+            target = destination / member.name
+
+            with ccstudiodss.utils.atomic_write(target, mode='wb') as f:
+                shutil.copyfileobj(tar.extractfile(member), f)
+
+            os.utime(
+                ccstudiodss.utils.fspath(target),
+                (member.mtime, member.mtime),
+            )
+
+            restored.append(target)
+
+    return restored
+
+
+@attr.s(frozen=True)
+class DirectoryStore:
+    """Entries as directories of files, e.g. on a mount shared by machines.
+
+    Entries are renamed into place complete so concurrent readers and
+    writers on other machines never see partial entries.  When max_size,
+    in bytes, or max_age, in seconds since last use, are given they are
+    enforced after each store.
+    """
+
+    path = attr.ib(factory=default_path, converter=pathlib.Path)
+    max_size = attr.ib(default=None)
+    max_age = attr.ib(default=None)
+
+    def entry_path(self, key):
+        return self.path / check_key(key)
+
+    def restore(self, key, destination):
+        """Copy the entry files into destination, returning their paths.
+
+        None is returned when there is no entry for the key.
+        """
+
+        entry = self.entry_path(key)
+
+        if not entry.is_dir():
+            return None
+
+        destination = pathlib.Path(destination)
+        destination.mkdir(parents=True, exist_ok=True)
+
+        restored = []
+
+        try:
+            for source in sorted(entry.iterdir()):
+                target = destination / source.name
+                shutil.copy2(
+                    ccstudiodss.utils.fspath(source),
+                    ccstudiodss.utils.fspath(target),
+                )
+                restored.append(target)
+
+            # record the use for eviction
+            os.utime(ccstudiodss.utils.fspath(entry))
+        except FileNotFoundError:
+            # evicted while being read
+            return None
+
+        return restored
+
+    def store(self, key, paths):
+        entry = self.entry_path(key)
+
+        if entry.is_dir():
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # populate a temporary directory and rename it into place so readers
+        # never see a partial entry
+        temporary = pathlib.Path(tempfile.mkdtemp(
+            prefix='.' + key + '-',
+            dir=ccstudiodss.utils.fspath(self.path),
+        ))
+
+        try:
+            for path in paths:
+                path = pathlib.Path(path)
+                shutil.copy2(
+                    ccstudiodss.utils.fspath(path),
+                    ccstudiodss.utils.fspath(temporary / path.name),
+                )
+
+            try:
+                os.replace(
+                    ccstudiodss.utils.fspath(temporary),
+                    ccstudiodss.utils.fspath(entry),
+                )
+            except OSError:
+                # another process stored the same entry first
+                if not entry.is_dir():
+                    raise
+        finally:
+            if temporary.exists():
+                shutil.rmtree(ccstudiodss.utils.fspath(temporary))
+
+        if self.max_size is not None or self.max_age is not None:
+            self.evict()
+
+    def entries(self):
+        if not self.path.is_dir():
+            return []
+
+        entries = []
+
+        for path in self.path.iterdir():
+            if key_pattern.match(path.name) is None:
+                continue
+
+            try:
+                entries.append(Entry(
+                    path=path,
+                    size=directory_size(path),
+                    last_used=path.stat().st_mtime,
+                ))
+            except FileNotFoundError:
+                pass
+
+        return entries
+
+    def evict(self, max_size=None, max_age=None):
+        """Remove entries beyond the limits, returning the removed entries.
+
+        The store's limits are used for those not given.
+        """
+
+        evicted = select_evictions(
+            entries=self.entries(),
+            max_size=self.max_size if max_size is None else max_size,
+            max_age=self.max_age if max_age is None else max_age,
+        )
+
+        for entry in evicted:
+            remove(entry.path)
+
+        return evicted
+
+    def clear(self):
+        if self.path.exists():
+            shutil.rmtree(ccstudiodss.utils.fspath(self.path))
+
+
+@attr.s(frozen=True)
+class HttpStore:
+    """Entries as archives at <url>/<key> fetched with GET and sent with PUT.
+
+    See ccstudiodss.cacheserver for a compatible server.  Any plain HTTP
+    server accepting PUT works as well.  Network and server errors and
+    truncated or malformed archives are treated as cache misses so an
+    unavailable cache never fails a build.
+    """
+
+    url = attr.ib()
+    timeout = attr.ib(default=30)
+
+    def entry_url(self, key):
+        return '{}/{}'.format(self.url.rstrip('/'), check_key(key))
+
+    def restore(self, key, destination):
+        import http.client
+        import urllib.request
+        import zlib
+
+        try:
+            with urllib.request.urlopen(
+                    self.entry_url(key),
+                    timeout=self.timeout,
+            ) as response:
+                with tempfile.TemporaryFile() as archive:
+                    shutil.copyfileobj(response, archive)
+                    archive.seek(0)
+
+                    return unpack(archive=archive, destination=destination)
+        except (
+                # includes urllib.error.HTTPError for a 404 miss
+                OSError,
+                # incomplete responses such as http.client.IncompleteRead
+                http.client.HTTPException,
+                # truncated, corrupt or unexpected archive contents
+                EOFError,
+                ValueError,
+                tarfile.TarError,
+                zlib.error,
+        ):
+            return None
+
+    def store(self, key, paths):
+        import http.client
+        import urllib.request
+
+        with tempfile.TemporaryFile() as archive:
+            pack(paths=paths, archive=archive)
+            size = archive.tell()
+            archive.seek(0)
+
+            request = urllib.request.Request(
+                self.entry_url(key),
+                data=archive,
+                method='PUT',
+                headers={
+                    'Content-Length': str(size),
+                    'Content-Type': 'application/gzip',
+                },
+            )
+
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+            except (OSError, http.client.HTTPException):
+                pass
+
+
+@attr.s(frozen=True)
+class SharedStore:
+    """Wrap a store shared between machines so failing to reach it never
+    fails a build.
+
+    Restore errors are treated as misses and store errors are ignored,
+    the build result is already in place either way.
+    """
+
+    wrapped = attr.ib()
+
+    def restore(self, key, destination):
+        import http.client
+
+        try:
+            return self.wrapped.restore(key=key, destination=destination)
+        except (OSError, http.client.HTTPException):
+            return None
+
+    def store(self, key, paths):
+        import http.client
+
+        try:
+            self.wrapped.store(key=key, paths=paths)
+        except (OSError, http.client.HTTPException):
+            pass
+
+
+@attr.s(frozen=True)
+class LayeredStore:
+    """Consult stores in order, copying hits into the earlier stores.
+
+    Typically a local DirectoryStore followed by a shared one.
+    """
+
+    stores = attr.ib(converter=tuple)
+
+    def restore(self, key, destination):
+        for index, store in enumerate(self.stores):
+            restored = store.restore(key=key, destination=destination)
+
+            if restored is not None:
+                for earlier in self.stores[:index]:
+                    earlier.store(key=key, paths=restored)
+
+                return restored
+
+        return None
+
+    def store(self, key, paths):
+        paths = list(paths)
+
+        for store in self.stores:
+            store.store(key=key, paths=paths)
+
+
+def open_store(location):
+    """An HttpStore for http(s) URLs, otherwise a DirectoryStore."""
+
+    location = ccstudiodss.utils.fspath(location)
+
+    if re.match(r'^https?://', location) is not None:
+        return HttpStore(url=location)
+
+    return DirectoryStore(path=location)
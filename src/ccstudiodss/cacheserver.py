@@ -0,0 +1,193 @@
+"""A minimal HTTP server for ccstudiodss.cache.HttpStore.
+
+Suitable for a CI farm or as a local stand-in for a shared artifact store.
+GET and HEAD fetch /<key> and PUT uploads it.  Uploads are written to a
+temporary file and renamed into place only once complete.
+"""
+
+import http.server
+import os
+import pathlib
+import shutil
+
+import attr
+
+import ccstudiodss.cache
+import ccstudiodss.utils
+
+
+@attr.s(frozen=True)
+class ArchiveDirectory:
+    path = attr.ib(converter=pathlib.Path)
+    max_size = attr.ib(default=None)
+    max_age = attr.ib(default=None)
+
+    def archive_path(self, key):
+        return self.path / (ccstudiodss.cache.check_key(key) + '.tar.gz')
+
+    def open(self, key):
+        """Open the archive for reading and record its use, None if missing."""
+
+        path = self.archive_path(key)
+
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            os.utime(ccstudiodss.utils.fspath(path))
+        except FileNotFoundError:
+            pass
+
+        return f
+
+    def write(self, key, stream, size):
+        """Copy size bytes from stream into the archive atomically."""
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self.archive_path(key)
+
+        with ccstudiodss.utils.atomic_write(path, mode='wb') as f:
+            remaining = size
+
+            while remaining > 0:
+                chunk = stream.read(min(remaining, 2**16))
+                if len(chunk) == 0:
+                    raise EOFError(
+                        'Upload ended {} bytes early'.format(remaining),
+                    )
+
+                f.write(chunk)
+                remaining -= len(chunk)
+
+        if self.max_size is not None or self.max_age is not None:
+            self.evict()
+
+    def entries(self):
+        if not self.path.is_dir():
+            return []
+
+        entries = []
+
+        for path in self.path.glob('*.tar.gz'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append(ccstudiodss.cache.Entry(
+                path=path,
+                size=stat.st_size,
+                last_used=stat.st_mtime,
+            ))
+
+        return entries
+
+    def evict(self):
+        evicted = ccstudiodss.cache.select_evictions(
+            entries=self.entries(),
+            max_size=self.max_size,
+            max_age=self.max_age,
+        )
+
+        for entry in evicted:
+            ccstudiodss.cache.remove(entry.path)
+
+        return evicted
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def key(self):
+        key = self.path.strip('/')
+
+        if ccstudiodss.cache.key_pattern.match(key) is None:
+            self.send_error(400, 'Invalid key')
+            return None
+
+        return key
+
+    def send_archive(self, body):
+        key = self.key()
+        if key is None:
+            return
+
+        f = self.server.archives.open(key)
+
+        if f is None:
+            self.send_error(404)
+            return
+
+        with f:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/gzip')
+            self.send_header(
+                'Content-Length',
+                str(os.fstat(f.fileno()).st_size),
+            )
+            self.end_headers()
+
+            if body:
+                shutil.copyfileobj(f, self.wfile)
+
+    def do_GET(self):
+        self.send_archive(body=True)
+
+    def do_HEAD(self):
+        self.send_archive(body=False)
+
+    def do_PUT(self):
+        key = self.key()
+        if key is None:
+            return
+
+        try:
+            size = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self.send_error(411)
+            return
+
+        try:
+            self.server.archives.write(key=key, stream=self.rfile, size=size)
+        except EOFError:
+            self.close_connection = True
+            return
+
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, archives, quiet=False):
+        super().__init__(address, Handler)
+        self.archives = archives
+        self.quiet = quiet
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+
+        return 'http://{}:{}'.format(host, port)
+
+
+def serve(path, host='127.0.0.1', port=0, max_size=None, max_age=None):
+    server = Server(
+        address=(host, port),
+        archives=ArchiveDirectory(
+            path=path,
+            max_size=max_size,
+            max_age=max_age,
+        ),
+    )
+
+    with server:
+        server.serve_forever()
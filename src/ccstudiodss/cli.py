@@ -1,10 +1,12 @@
 import os
 import pathlib
-import webbrowser
+import subprocess
 
+import attr
 import click
 
 import ccstudiodss.api
+import ccstudiodss.trace
 import ccstudiodss.utils
 
 
@@ -54,8 +56,8 @@ def create_workspace_suffix_option(project_name):
         type=str,
         envvar=variable_name,
         help=(
-             'Suffix used when creating workspace such as for parallel builds in'
-             ' CI (${})'.format(variable_name)
+             'Suffix selecting a separate pool of workspaces, builds are'
+             ' safe to run in parallel without one (${})'.format(variable_name)
         ),
     )
 
@@ -64,69 +66,335 @@ workspace_suffix_option = create_workspace_suffix_option(project_name='dss')
 
 
 def default_base_path():
-    base_path = ccstudiodss.utils.find_base_path()
-    if base_path is None:
-        return {'required': True}
-    
-    return {'default': base_path}
+    import ccstudiodss.installations
+
+    try:
+        return ccstudiodss.installations.default().base_path
+    except ccstudiodss.utils.BasePathError:
+        return None
+
+
+def require_value(ctx, param, value):
+    # defaults are searched for lazily so required can not be decided when
+    # the option is created
+    if value is None:
+        raise click.MissingParameter(ctx=ctx, param=param)
+
+    return value
+
 
 ccs_base_path_option = click.option(
     '--ccs-base-path',
     type=click.Path(exists=True, file_okay=False),
-    show_default=True,
-    **default_base_path(),
+    default=default_base_path,
+    callback=require_value,
+    show_default='searched for',
     help='CCS base directory, e.g. /ti/ccsv8/ccs_base'
 )
 
 
 @click.group()
-def cli():
-    pass
+@click.option(
+    '--trace',
+    type=click.Path(dir_okay=False, writable=True),
+    envvar='DSS_TRACE',
+    help=(
+        'Write timing of the build, connect and load phases as Chrome trace'
+        ' event JSON ($DSS_TRACE)'
+    ),
+)
+@click.pass_context
+def cli(ctx, trace):
+    if trace is not None:
+        ctx.with_resource(ccstudiodss.trace.recording(path=trace))
 
 
-def default_ccxml():
-    cwd = pathlib.Path().resolve()
-    for path in [cwd, *cwd.parents]:
+def find_ccxml(paths):
+    for path in paths:
         found = tuple(path.glob('*.ccxml'))
 
         if len(found) == 1:
-            return {'default': ccstudiodss.utils.fspath(found[0])}
+            return found[0]
         elif len(found) > 1:
             break
 
-    return {'required': True}
+    return None
+
+
+def default_ccxml():
+    cwd = pathlib.Path().resolve()
+    ccxml = find_ccxml(paths=[cwd, *cwd.parents])
+
+    if ccxml is None:
+        return None
+
+    return ccstudiodss.utils.fspath(ccxml)
 
 
 ccxml_option = click.option(
     '--ccxml',
     type=click.Path(exists=True, dir_okay=False),
-    show_default=True,
-    **default_ccxml(),
+    default=default_ccxml,
+    callback=require_value,
+    show_default='single .ccxml in the current directory or a parent',
 )
 
 
+def create_daemon_socket_option(project_name):
+    variable_name = '{}_DAEMON_SOCKET'.format(project_name.upper())
+
+    return click.option(
+        '--daemon-socket',
+        type=click.Path(dir_okay=False),
+        envvar=variable_name,
+        help=(
+            'Socket of the daemon holding the debug session, defaults to'
+            ' daemon.sock in the generated directory (${})'.format(
+                variable_name,
+            )
+        ),
+    )
+
+
+daemon_socket_option = create_daemon_socket_option(project_name='dss')
+
+
+def create_use_daemon_option(project_name):
+    variable_name = '{}_USE_DAEMON'.format(project_name.upper())
+
+    return click.option(
+        '--daemon/--no-daemon',
+        'use_daemon',
+        default=True,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Route the command through the daemon when it is running'
+            ' (${})'.format(variable_name)
+        ),
+    )
+
+
+use_daemon_option = create_use_daemon_option(project_name='dss')
+
+
+def running_daemon(use_daemon, daemon_socket):
+    import ccstudiodss.daemon
+
+    if not use_daemon:
+        return None
+
+    return ccstudiodss.daemon.running_client(path=daemon_socket)
+
+
 @cli.command()
 @ccxml_option
 @ccs_base_path_option
-def restart(ccxml, ccs_base_path):
+@use_daemon_option
+@daemon_socket_option
+def restart(ccxml, ccs_base_path, use_daemon, daemon_socket):
+    client = running_daemon(
+        use_daemon=use_daemon,
+        daemon_socket=daemon_socket,
+    )
+    if client is not None:
+        client.restart(ccxml=ccxml)
+        return
+
     ccstudiodss.api.add_jars(base_path=ccs_base_path)
 
     with ccstudiodss.api.Session(ccxml=ccxml) as session:
         session.restart()
 
 
+@cli.group()
+def daemon():
+    """Keep the JVM and debug sessions alive between commands."""
+
+
+@daemon.command()
+@ccs_base_path_option
+@daemon_socket_option
+def start(ccs_base_path, daemon_socket):
+    """Run the daemon in the foreground."""
+
+    import ccstudiodss.daemon
+
+    ccstudiodss.daemon.serve(path=daemon_socket, base_path=ccs_base_path)
+
+
+@daemon.command()
+@daemon_socket_option
+def stop(daemon_socket):
+    """Stop a running daemon."""
+
+    import ccstudiodss.daemon
+
+    client = ccstudiodss.daemon.running_client(path=daemon_socket)
+    if client is None:
+        raise click.ClickException('Daemon is not running')
+
+    client.stop()
+
+
+@daemon.command()
+@daemon_socket_option
+def disconnect(daemon_socket):
+    """Disconnect all sessions held by a running daemon."""
+
+    import ccstudiodss.daemon
+
+    client = ccstudiodss.daemon.running_client(path=daemon_socket)
+    if client is None:
+        raise click.ClickException('Daemon is not running')
+
+    client.disconnect()
+
+
+@daemon.command()
+@daemon_socket_option
+def status(daemon_socket):
+    """Report whether the daemon is running."""
+
+    import ccstudiodss.daemon
+
+    client = ccstudiodss.daemon.running_client(path=daemon_socket)
+    if client is None:
+        click.echo('Not running')
+        raise click.exceptions.Exit(1)
+
+    click.echo('Running with pid {}'.format(client.ping()['pid']))
+
+
+@cli.command()
+@click.option(
+    '--refresh',
+    is_flag=True,
+    help='Search for installations rather than using the cached index',
+)
+def installations(refresh):
+    """List the CCS installations found, the default first."""
+
+    import ccstudiodss.installations
+
+    if refresh:
+        ccstudiodss.installations.load(refresh=True)
+
+    default = ccstudiodss.installations.default()
+    found = ccstudiodss.installations.load().installations
+
+    if default not in found:
+        found = (default, *found)
+
+    for installation in found:
+        click.echo('{} {} (version: {}, executable: {})'.format(
+            '*' if installation == default else ' ',
+            ccstudiodss.utils.fspath(installation.base_path),
+            installation.version,
+            installation.executable,
+        ))
+
+    click.echo('Index: {}'.format(
+        ccstudiodss.utils.fspath(ccstudiodss.installations.index_path()),
+    ))
+
+
+@cli.group()
+def cache():
+    """Manage build caches."""
+
+
+def default_cache_path():
+    import ccstudiodss.cache
+
+    return ccstudiodss.utils.fspath(ccstudiodss.cache.default_path())
+
+
+cache_path_option = click.option(
+    '--path',
+    type=click.Path(file_okay=False),
+    default=default_cache_path,
+    show_default='the local build cache',
+)
+max_size_option = click.option(
+    '--max-size',
+    type=click.IntRange(min=0),
+    help='Evict least recently used entries beyond this many bytes',
+)
+max_age_option = click.option(
+    '--max-age',
+    type=click.FloatRange(min=0),
+    help='Evict entries unused for this many seconds',
+)
+
+
+@cache.command()
+@cache_path_option
+@max_size_option
+@max_age_option
+def evict(path, max_size, max_age):
+    """Remove entries from a cache directory beyond the limits."""
+
+    import ccstudiodss.cache
+
+    evicted = ccstudiodss.cache.DirectoryStore(path=path).evict(
+        max_size=max_size,
+        max_age=max_age,
+    )
+
+    click.echo('Evicted {} entries, {} bytes'.format(
+        len(evicted),
+        sum(entry.size for entry in evicted),
+    ))
+
+
+@cache.command()
+@cache_path_option
+def clear(path):
+    """Remove all entries from a cache directory."""
+
+    import ccstudiodss.cache
+
+    ccstudiodss.cache.DirectoryStore(path=path).clear()
+
+
+@cache.command()
+@click.option(
+    '--path',
+    type=click.Path(file_okay=False),
+    required=True,
+    help='Directory to store the archives in',
+)
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', type=click.IntRange(min=0), default=8080, show_default=True)
+@max_size_option
+@max_age_option
+def serve(path, host, port, max_size, max_age):
+    """Serve a shared build cache over HTTP for --cache-url."""
+
+    import ccstudiodss.cacheserver
+
+    ccstudiodss.cacheserver.serve(
+        path=path,
+        host=host,
+        port=port,
+        max_size=max_size,
+        max_age=max_age,
+    )
+
+
 @cli.command()
 @ccs_base_path_option
 @click.option('--open/--show', 'open_', default=True)
 def docs(ccs_base_path, open_):
-    if ccs_base_path is None:
-        ccs_base_path = ccstudiodss.utils.find_base_path()
-
     path = os.fspath(
-            ccs_base_path / 'scripting' / 'docs' / 'GettingStarted.htm',
+            pathlib.Path(ccs_base_path)
+            / 'scripting' / 'docs' / 'GettingStarted.htm',
         )
 
     if open_:
+        import webbrowser
+
         webbrowser.open(path)
     else:
         click.echo(path)
@@ -197,6 +465,178 @@ def create_targets_option(
     )
 
 
+def create_jobs_option(project_name):
+    variable_name = '{}_JOBS'.format(project_name.upper())
+
+    return click.option(
+        '--jobs', '-j',
+        type=click.IntRange(min=1),
+        default=1,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Number of targets to build concurrently, each in a separate'
+            ' workspace (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_build_cache_option(project_name):
+    variable_name = '{}_BUILD_CACHE'.format(project_name.upper())
+
+    return click.option(
+        '--cache/--no-cache',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Restore artifacts from a previous build with identical inputs'
+            ' (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_cache_url_option(project_name):
+    variable_name = '{}_CACHE_URL'.format(project_name.upper())
+
+    return click.option(
+        '--cache-url',
+        envvar=variable_name,
+        help=(
+            'Shared build cache consulted after the local one, a directory'
+            ' such as a network mount or an http(s) URL served by'
+            ' `dss cache serve` (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_build_store(cache, cache_url):
+    import ccstudiodss.cache
+
+    stores = []
+
+    if cache:
+        stores.append(ccstudiodss.cache.DirectoryStore())
+
+    if cache_url is not None:
+        stores.append(ccstudiodss.cache.SharedStore(
+            wrapped=ccstudiodss.cache.open_store(cache_url),
+        ))
+
+    if len(stores) == 0:
+        return None
+
+    if len(stores) == 1:
+        return stores[0]
+
+    return ccstudiodss.cache.LayeredStore(stores=stores)
+
+
+def create_batch_option(project_name):
+    variable_name = '{}_BATCH'.format(project_name.upper())
+
+    return click.option(
+        '--batch/--no-batch',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Build all targets in a single Eclipse run, incompatible with'
+            ' --jobs and clean builds (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_makefiles_option(project_name):
+    variable_name = '{}_MAKEFILES'.format(project_name.upper())
+
+    return click.option(
+        '--makefiles/--eclipse',
+        'use_makefiles',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Run the CCS generated makefiles directly when they are up to date'
+            ' with the project settings (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_make_jobs_option(project_name):
+    variable_name = '{}_MAKE_JOBS'.format(project_name.upper())
+
+    return click.option(
+        '--make-jobs',
+        type=click.IntRange(min=1),
+        envvar=variable_name,
+        help=(
+            'Parallel jobs for gmake, defaults to the CPU count'
+            ' (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_fail_fast_option(project_name):
+    variable_name = '{}_FAIL_FAST'.format(project_name.upper())
+
+    return click.option(
+        '--fail-fast/--no-fail-fast',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Stop at the first compiler, linker or make error and skip'
+            ' targets not yet started (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_log_directory_option(project_name):
+    variable_name = '{}_LOG_DIRECTORY'.format(project_name.upper())
+
+    return click.option(
+        '--log-directory',
+        type=click.Path(file_okay=False, writable=True),
+        envvar=variable_name,
+        help=(
+            'Write the output of each target built with --jobs to'
+            ' <target>.log in this directory (${})'.format(variable_name)
+        ),
+    )
+
+
+def echo_diagnostics(diagnostics):
+    for diagnostic in diagnostics:
+        if diagnostic.error or diagnostic.severity == 'warning':
+            click.echo(str(diagnostic))
+
+
+def report_target_results(targets, failed):
+    for target in targets:
+        status = 'failed' if target in failed else 'succeeded'
+        click.echo('{}: {}'.format(target, status))
+
+    if len(failed) > 0:
+        raise click.ClickException('Failed targets: {}'.format(
+            ', '.join(failed),
+        ))
+
+
+def echo_build_error(error):
+    """Report errors not already described by the build output."""
+
+    if isinstance(error, subprocess.CalledProcessError):
+        return
+
+    message = str(error)
+
+    if message == '':
+        click.echo(type(error).__name__)
+    else:
+        click.echo('{}: {}'.format(type(error).__name__, message))
+
+
 def create_build_command(
         project_name,
         default_targets=None,
@@ -215,15 +655,33 @@ def create_build_command(
     )
     @create_project_name_option(project_name=project_name)
     @create_workspace_suffix_option(project_name=project_name)
+    @create_jobs_option(project_name=project_name)
+    @create_build_cache_option(project_name=project_name)
+    @create_cache_url_option(project_name=project_name)
+    @create_batch_option(project_name=project_name)
+    @create_makefiles_option(project_name=project_name)
+    @create_make_jobs_option(project_name=project_name)
+    @create_fail_fast_option(project_name=project_name)
+    @create_log_directory_option(project_name=project_name)
     def build(
             targets,
             build_type,
             project_root,
             project_name,
             workspace_suffix,
+            jobs,
+            cache,
+            cache_url,
+            batch,
+            use_makefiles,
+            make_jobs,
+            fail_fast,
+            log_directory,
     ):
         """Build the project using Code Composer Studio."""
 
+        cache = create_build_store(cache=cache, cache_url=cache_url)
+
         if workspace_suffix is not None:
             workspace_suffix = '-' + workspace_suffix
 
@@ -235,21 +693,212 @@ def create_build_command(
                 path=project_root / '.cproject',
             )
 
-        for target in targets:
-            ccstudiodss.api.build(
-                target=target,
+        if batch:
+            if jobs != 1:
+                raise click.UsageError('--batch can not be used with --jobs')
+
+            if fail_fast or log_directory is not None:
+                raise click.UsageError(
+                    '--batch can not be used with --fail-fast or'
+                    ' --log-directory',
+                )
+
+            if cache is not None:
+                raise click.UsageError(
+                    '--batch can not be used with --cache or --cache-url',
+                )
+
+            if use_makefiles:
+                raise click.UsageError(
+                    '--batch can not be used with --makefiles',
+                )
+
+            if project_name is None:
+                project_names = None
+            else:
+                project_names = {project_root: project_name}
+
+            results = ccstudiodss.api.build_configurations(
+                configurations=[(project_root, target) for target in targets],
                 build_type=build_type,
-                project_root=project_root,
-                project_name=project_name,
                 suffix=workspace_suffix,
+                project_names=project_names,
             )
 
+            for result in results:
+                click.echo(result.output)
+
+            report_target_results(
+                targets=targets,
+                failed=[
+                    result.target
+                    for result in results
+                    if not result.succeeded
+                ],
+            )
+
+            return
+
+        if jobs == 1 and log_directory is None:
+            for target in targets:
+                try:
+                    ccstudiodss.api.build(
+                        target=target,
+                        build_type=build_type,
+                        project_root=project_root,
+                        project_name=project_name,
+                        suffix=workspace_suffix,
+                        cache=cache,
+                        use_makefiles=use_makefiles,
+                        make_jobs=make_jobs,
+                        fail_fast=fail_fast,
+                    )
+                except ccstudiodss.api.build_errors() as e:
+                    raise click.ClickException(
+                        '{}: {}'.format(target, e),
+                    ) from e
+
+            return
+
+        results = ccstudiodss.api.build_targets(
+            targets=targets,
+            build_type=build_type,
+            project_root=project_root,
+            project_name=project_name,
+            suffix=workspace_suffix,
+            jobs=jobs,
+            cache=cache,
+            use_makefiles=use_makefiles,
+            make_jobs=make_jobs,
+            fail_fast=fail_fast,
+            log_directory=log_directory,
+        )
+
+        failed = []
+
+        for result in results:
+            click.echo('==== {} ===='.format(result.target))
+
+            if result.log is None:
+                click.echo(result.output.decode('utf-8', errors='replace'))
+            else:
+                echo_diagnostics(result.diagnostics)
+                click.echo('Log: {}'.format(
+                    ccstudiodss.utils.fspath(result.log),
+                ))
+
+            if not result.succeeded:
+                echo_build_error(result.error)
+                failed.append(result.target)
+
+        report_target_results(targets=targets, failed=failed)
+
     return build
 
 
 cli.add_command(create_build_command(project_name='dss'))
 
 
+def create_build_projects_command(project_name):
+    @click.command()
+    @click.option('--target', required=True, help='Target built in each project')
+    @build_type_option
+    @click.option(
+        '--search-path',
+        'search_paths',
+        type=click.Path(exists=True, file_okay=False),
+        multiple=True,
+        help=(
+            'Directory holding referenced projects, in addition to those'
+            ' holding the given projects'
+        ),
+    )
+    @create_workspace_suffix_option(project_name=project_name)
+    @create_jobs_option(project_name=project_name)
+    @create_build_cache_option(project_name=project_name)
+    @create_cache_url_option(project_name=project_name)
+    @create_makefiles_option(project_name=project_name)
+    @create_make_jobs_option(project_name=project_name)
+    @create_fail_fast_option(project_name=project_name)
+    @create_log_directory_option(project_name=project_name)
+    @click.argument(
+        'project_roots',
+        nargs=-1,
+        required=True,
+        type=click.Path(exists=True, file_okay=False),
+    )
+    def build_projects(
+            target,
+            build_type,
+            search_paths,
+            workspace_suffix,
+            jobs,
+            cache,
+            cache_url,
+            use_makefiles,
+            make_jobs,
+            fail_fast,
+            log_directory,
+            project_roots,
+    ):
+        """Build projects after the projects they reference."""
+
+        import ccstudiodss.project
+
+        if workspace_suffix is not None:
+            workspace_suffix = '-' + workspace_suffix
+
+        try:
+            results = list(ccstudiodss.api.build_projects(
+                project_roots=project_roots,
+                target=target,
+                build_type=build_type,
+                search_paths=search_paths,
+                suffix=workspace_suffix,
+                jobs=jobs,
+                cache=create_build_store(cache=cache, cache_url=cache_url),
+                use_makefiles=use_makefiles,
+                make_jobs=make_jobs,
+                fail_fast=fail_fast,
+                log_directory=log_directory,
+            ))
+        except (
+                ccstudiodss.project.ProjectNotFoundError,
+                ccstudiodss.project.DependencyCycleError,
+        ) as e:
+            raise click.ClickException(str(e)) from e
+
+        for result in results:
+            click.echo('==== {} ===='.format(result.project.name))
+
+            if result.build.log is None:
+                click.echo(
+                    result.build.output.decode('utf-8', errors='replace'),
+                )
+            else:
+                echo_diagnostics(result.build.diagnostics)
+                click.echo('Log: {}'.format(
+                    ccstudiodss.utils.fspath(result.build.log),
+                ))
+
+            if not result.succeeded:
+                echo_build_error(result.build.error)
+
+        report_target_results(
+            targets=[result.project.name for result in results],
+            failed=[
+                result.project.name
+                for result in results
+                if not result.succeeded
+            ],
+        )
+
+    return build_projects
+
+
+cli.add_command(create_build_projects_command(project_name='dss'))
+
+
 def create_list_targets_command(project_name, default_project_root=None):
     @click.command()
     @create_project_root_option(
@@ -281,23 +930,27 @@ cli.add_command(create_list_targets_command(project_name='dss'))
 def create_ccxml_option(project_name, project_root=None):
     variable_name = '{}_CCXML'.format(project_name.upper())
 
-    if project_root is None:
-        project_root = pathlib.Path.cwd()
+    def default():
+        root = project_root
+        if root is None:
+            root = pathlib.Path.cwd()
+
+        ccxml = find_ccxml(paths=[pathlib.Path(root)])
+
+        if ccxml is None:
+            return None
+
+        return ccstudiodss.utils.fspath(ccxml)
 
-    paths = list(project_root.glob('*.ccxml'))
-    if len(paths) == 1:
-        default_or_required = {'default': paths[0]}
-    else:
-        default_or_required = {'required': True}
-        
     ccxml_option = click.option(
         '--ccxml',
         type=click.Path(exists=True, dir_okay=False),
         envvar=variable_name,
-        **default_or_required,
+        default=default,
+        callback=require_value,
         help='.ccxml device configuration file (${})'.format(variable_name),
-        show_default=True,
-        )
+        show_default='single .ccxml in the project root',
+    )
 
     return ccxml_option
 
@@ -348,7 +1001,7 @@ def create_timeout_option(
     return click.option(
         '--timeout', 'timeout',
         default=timeout,
-        type=str,
+        type=click.FloatRange(min=0, min_open=True),
         envvar=variable_name,
         help='Time in seconds after which to abort (${})'.format(
             variable_name,
@@ -358,6 +1011,119 @@ def create_timeout_option(
     )
 
 
+class IntegerType(click.ParamType):
+    """An integer accepting prefixed literals such as 0x8000."""
+
+    name = 'integer'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+
+        try:
+            return int(value, 0)
+        except ValueError:
+            self.fail('{!r} is not a valid integer'.format(value), param, ctx)
+
+
+def create_skip_if_loaded_option(project_name):
+    variable_name = '{}_SKIP_IF_LOADED'.format(project_name.upper())
+
+    return click.option(
+        '--skip-if-loaded/--always-load',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Only restart the target if the same binary was the last one'
+            ' loaded by this tool (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_differential_option(project_name):
+    variable_name = '{}_DIFFERENTIAL'.format(project_name.upper())
+
+    return click.option(
+        '--differential/--full-load',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'Only write the ELF sections that changed since the last load'
+            ' (${})'.format(variable_name)
+        ),
+    )
+
+
+def create_verify_sections_option(project_name):
+    variable_name = '{}_VERIFY_SECTIONS'.format(project_name.upper())
+
+    return click.option(
+        '--verify-sections/--trust-sections',
+        default=False,
+        envvar=variable_name,
+        show_default=True,
+        help=(
+            'With --differential also read back the unchanged sections and'
+            ' rewrite those that differ (${})'.format(variable_name)
+        ),
+    )
+
+
+def echo_section_load(report):
+    click.echo('Wrote {} bytes in {} sections, skipped {} bytes in {} sections'.format(
+        report['bytes_written'],
+        len(report['written']),
+        report['bytes_skipped'],
+        len(report['skipped']),
+    ))
+
+
+def create_verify_options(project_name):
+    address_variable_name = '{}_VERIFY_ADDRESS'.format(project_name.upper())
+    count_variable_name = '{}_VERIFY_COUNT'.format(project_name.upper())
+    page_variable_name = '{}_VERIFY_PAGE'.format(project_name.upper())
+
+    options = (
+        click.option(
+            '--verify-address',
+            type=IntegerType(),
+            envvar=address_variable_name,
+            help=(
+                'Address of memory read back to confirm the recorded binary'
+                ' is still loaded (${})'.format(address_variable_name)
+            ),
+        ),
+        click.option(
+            '--verify-count',
+            type=click.IntRange(min=1),
+            default=8,
+            envvar=count_variable_name,
+            show_default=True,
+            help='Number of values read back (${})'.format(
+                count_variable_name,
+            ),
+        ),
+        click.option(
+            '--verify-page',
+            type=int,
+            default=0,
+            envvar=page_variable_name,
+            show_default=True,
+            help='Memory page read back (${})'.format(page_variable_name),
+        ),
+    )
+
+    def decorator(f):
+        for option in reversed(options):
+            f = option(f)
+
+        return f
+
+    return decorator
+
+
 def create_load_command(project_name, project_root=None, device_pattern_option=None):
     if device_pattern_option is None:
         device_pattern_option = create_device_pattern_option(project_name=project_name)
@@ -368,9 +1134,61 @@ def create_load_command(project_name, project_root=None, device_pattern_option=N
     @device_pattern_option
     @create_timeout_option(project_name=project_name)
     @ccs_base_path_option
-    def load(binary, ccxml, device_pattern, timeout, ccs_base_path):
+    @create_use_daemon_option(project_name=project_name)
+    @create_daemon_socket_option(project_name=project_name)
+    @create_skip_if_loaded_option(project_name=project_name)
+    @create_verify_options(project_name=project_name)
+    @create_differential_option(project_name=project_name)
+    @create_verify_sections_option(project_name=project_name)
+    def load(
+            binary,
+            ccxml,
+            device_pattern,
+            timeout,
+            ccs_base_path,
+            use_daemon,
+            daemon_socket,
+            skip_if_loaded,
+            verify_address,
+            verify_count,
+            verify_page,
+            differential,
+            verify_sections,
+    ):
         """Load the project to the board."""
 
+        import ccstudiodss.ledger
+
+        if verify_address is None:
+            region = None
+        else:
+            region = ccstudiodss.ledger.Region(
+                address=verify_address,
+                count=verify_count,
+                page=verify_page,
+            )
+
+        client = running_daemon(
+            use_daemon=use_daemon,
+            daemon_socket=daemon_socket,
+        )
+        if client is not None:
+            result = client.load(
+                ccxml=ccxml,
+                binary=binary,
+                device_pattern=device_pattern,
+                timeout=timeout,
+                skip_if_loaded=skip_if_loaded,
+                region=region,
+                differential=differential,
+                verify_sections=verify_sections,
+            )
+
+            if differential:
+                echo_section_load(result)
+
+            return
+
         ccstudiodss.api.add_jars(base_path=ccs_base_path)
 
         session = ccstudiodss.api.Session(
@@ -378,7 +1196,22 @@ def create_load_command(project_name, project_root=None, device_pattern_option=N
             device_pattern=device_pattern,
         )
         with session:
-            session.load(binary=binary, timeout=timeout)
+            if differential:
+                report = session.load_sections(
+                    binary=binary,
+                    timeout=timeout,
+                    verify=verify_sections,
+                )
+                echo_section_load(attr.asdict(report))
+            else:
+                session.load(
+                    binary=binary,
+                    timeout=timeout,
+                    ledger=ccstudiodss.ledger.Ledger(),
+                    skip_if_loaded=skip_if_loaded,
+                    region=region,
+                )
+
             session.run()
 
     return load
@@ -390,3 +1223,88 @@ cli.add_command(
     ),
     name='load',
 )
+
+
+@cli.command()
+@create_binary_option(project_name='dss', required=True)
+@click.option(
+    '--address',
+    'addresses',
+    type=IntegerType(),
+    multiple=True,
+    help='Find the symbol containing this address',
+)
+@click.argument('names', nargs=-1)
+def symbols(binary, addresses, names):
+    """Look up symbols in the binary by name or address."""
+
+    import ccstudiodss.symbols
+
+    index = ccstudiodss.symbols.load(binary)
+
+    found = [index[name] for name in names if name in index]
+    missing = [name for name in names if name not in index]
+
+    for address in addresses:
+        symbol = index.at(address)
+        if symbol is None:
+            missing.append('0x{:x}'.format(address))
+        else:
+            found.append(symbol)
+
+    for symbol in found:
+        click.echo('{} 0x{:x} {}'.format(symbol.name, symbol.address, symbol.size))
+
+    if len(missing) > 0:
+        raise click.ClickException('Not found: {}'.format(', '.join(missing)))
+
+
+@cli.command()
+@click.option(
+    '--repeat',
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help='Runs of each benchmark',
+)
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Write the results and environment metadata as JSON',
+)
+@click.argument('names', nargs=-1)
+def benchmark(repeat, output, names):
+    """Time the Python side of sessions, loads and builds.
+
+    Sessions use the stand-in DSS backend and builds a fake Eclipse
+    executable so no CCS install or hardware is needed.
+    """
+
+    import ccstudiodss.benchmark
+
+    known = {benchmark.name for benchmark in ccstudiodss.benchmark.benchmarks}
+    unknown = [name for name in names if name not in known]
+    if len(unknown) > 0:
+        raise click.ClickException('Unknown benchmarks: {}'.format(
+            ', '.join(unknown),
+        ))
+
+    results = []
+
+    for result in ccstudiodss.benchmark.run(
+            names=None if len(names) == 0 else names,
+            repeat=repeat,
+    ):
+        results.append(result)
+
+        if result.skipped is not None:
+            click.echo('{:<28} skipped: {}'.format(result.name, result.skipped))
+        else:
+            click.echo('{:<28} min {:10.3f} ms  median {:10.3f} ms'.format(
+                result.name,
+                result.minimum * 1e3,
+                result.median * 1e3,
+            ))
+
+    if output is not None:
+        ccstudiodss.benchmark.write_results(path=output, results=results)
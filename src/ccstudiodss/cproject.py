@@ -0,0 +1,243 @@
+import functools
+import io
+import os
+import pathlib
+import re
+
+import attr
+
+import ccstudiodss.utils
+
+
+settings_module = 'org.eclipse.cdt.core.settings'
+
+default_artifact_name = '${ProjName}'
+default_artifact_extension = 'out'
+
+# files the TI tools write beside the artifact with the same base name
+output_extensions = ('map', 'hex', 'bin')
+
+variable_pattern = re.compile(r'\$\{(?P<name>\w+)\}')
+xml_declaration_pattern = re.compile(r'^\s*<\?xml[^>]*\?>')
+workspace_location_pattern = re.compile(
+    r'^\$\{workspace_loc:/[^/}]*(?P<path>(?:/[^}]*)?)\}(?P<rest>.*)$',
+)
+
+
+@attr.s(frozen=True)
+class Configuration:
+    """A build configuration as recorded in a CDT .cproject file.
+
+    artifact_name, artifact_extension and build_path are the raw values,
+    possibly referencing build variables such as ${ProjName}.
+    """
+
+    name = attr.ib()
+    id = attr.ib()
+    artifact_name = attr.ib(default=default_artifact_name)
+    artifact_extension = attr.ib(default=default_artifact_extension)
+    build_path = attr.ib(default=None)
+
+    def variables(self, project_name):
+        return {
+            'ProjName': project_name,
+            'ConfigName': self.name,
+            'BuildDirectory': self.name,
+        }
+
+    def expand(self, value, project_name):
+        variables = self.variables(project_name=project_name)
+
+        def replace(match):
+            return variables.get(match.group('name'), match.group(0))
+
+        return variable_pattern.sub(replace, value)
+
+    def output_directory(self, project_root, project_name):
+        """The directory the build writes the artifact to.
+
+        The default, ${BuildDirectory} and the configuration name are all
+        project_root/<configuration name>.  Workspace locations within the
+        project and relative paths are resolved against project_root.
+        """
+
+        project_root = pathlib.Path(project_root)
+
+        if self.build_path is None or self.build_path.strip() == '':
+            return project_root / self.name
+
+        build_path = self.expand(
+            self.build_path.strip(),
+            project_name=project_name,
+        )
+
+        match = workspace_location_pattern.match(build_path)
+        if match is not None:
+            build_path = (
+                match.group('path') + match.group('rest')
+            ).lstrip('/')
+
+        return project_root / build_path
+
+    def artifact_base_name(self, project_name):
+        return self.expand(self.artifact_name, project_name=project_name)
+
+    def artifact_file_name(self, project_name):
+        name = self.artifact_base_name(project_name=project_name)
+
+        if self.artifact_extension == '':
+            return name
+
+        return '{}.{}'.format(name, self.artifact_extension)
+
+    def artifact(self, project_root, project_name):
+        return self.output_directory(
+            project_root=project_root,
+            project_name=project_name,
+        ) / self.artifact_file_name(project_name=project_name)
+
+    def outputs(
+            self,
+            project_root,
+            project_name,
+            extensions=output_extensions,
+    ):
+        """The artifact path followed by the paths of possible companions."""
+
+        artifact = self.artifact(
+            project_root=project_root,
+            project_name=project_name,
+        )
+        name = self.artifact_base_name(project_name=project_name)
+
+        return [
+            artifact,
+            *(
+                artifact.parent / '{}.{}'.format(name, extension)
+                for extension in extensions
+                if extension != self.artifact_extension
+            ),
+        ]
+
+
+def parse(file):
+    """Read the configurations from a .cproject path or file object.
+
+    The file is parsed incrementally and each configuration's elements are
+    discarded once read so large files are handled in a single pass.
+    """
+
+    import lxml.etree
+
+    if hasattr(file, 'read') and isinstance(file.read(0), str):
+        # the text is already decoded, drop its declaration so the UTF-8
+        # bytes handed to iterparse are not read as the declared encoding
+        text = xml_declaration_pattern.sub('', file.read(), count=1)
+        file = io.BytesIO(text.encode('utf-8'))
+
+    configurations = []
+    current = None
+
+    for event, element in lxml.etree.iterparse(
+            file,
+            events=('start', 'end'),
+            tag=(
+                'cconfiguration',
+                'storageModule',
+                'configuration',
+                'builder',
+            ),
+    ):
+        tag = element.tag
+
+        if event == 'end':
+            if tag == 'storageModule' and current is None:
+                if element.get('moduleId') == settings_module:
+                    # all configurations have been read
+                    break
+            elif tag == 'cconfiguration':
+                if current is not None and 'name' in current:
+                    configurations.append(Configuration(**current))
+
+                current = None
+                element.clear()
+
+                # drop completed siblings to keep memory flat
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+            continue
+
+        if tag == 'cconfiguration':
+            current = {'id': element.get('id')}
+        elif current is None:
+            continue
+        elif tag == 'storageModule':
+            if (
+                    element.get('moduleId') == settings_module
+                    and element.get('name') is not None
+            ):
+                current['name'] = element.get('name')
+                current['id'] = element.get('id', current['id'])
+        elif tag == 'configuration':
+            if 'artifact_name' not in current:
+                current['artifact_name'] = element.get(
+                    'artifactName',
+                    default_artifact_name,
+                )
+                current['artifact_extension'] = element.get(
+                    'artifactExtension',
+                    default_artifact_extension,
+                )
+        elif tag == 'builder':
+            if 'build_path' not in current:
+                current['build_path'] = element.get('buildPath')
+
+    return tuple(configurations)
+
+
+@functools.lru_cache(maxsize=32)
+def cached_parse(path, mtime, size):
+    return parse(path)
+
+
+def read(path):
+    """Read the configurations from the .cproject at path.
+
+    Results are cached in process by path, modification time and size so
+    repeated reads of an unchanged file are not parsed again.
+    """
+
+    path = os.path.abspath(ccstudiodss.utils.fspath(path))
+    stat = os.stat(path)
+
+    return cached_parse(path=path, mtime=stat.st_mtime_ns, size=stat.st_size)
+
+
+def read_project(project_root):
+    return read(pathlib.Path(project_root) / '.cproject')
+
+
+def configuration_names(configurations):
+    return [configuration.name for configuration in configurations]
+
+
+def find(configurations, name):
+    for configuration in configurations:
+        if configuration.name == name:
+            return configuration
+
+    raise KeyError(name)
+
+
+def find_in_project(project_root, name):
+    """The named configuration of the project.
+
+    When the .cproject is missing or does not list the configuration the
+    CCS defaults are assumed.
+    """
+
+    try:
+        return find(read_project(project_root), name)
+    except (OSError, KeyError):
+        return Configuration(name=name, id=None)
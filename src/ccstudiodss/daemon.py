@@ -0,0 +1,288 @@
+import contextlib
+import json
+import os
+import pathlib
+import socket
+import socketserver
+import threading
+
+import attr
+
+import ccstudiodss.api
+import ccstudiodss.ledger
+import ccstudiodss.utils
+
+
+class DaemonError(Exception):
+    pass
+
+
+def default_socket_path():
+    return ccstudiodss.utils.generated_path_root() / 'daemon.sock'
+
+
+@attr.s
+class Sessions:
+    """Connected sessions kept alive between requests.
+
+    Sessions are opened in the shared environment and keyed by ccxml and
+    device pattern so several targets can be held at once.
+    """
+
+    environment = attr.ib()
+    sessions = attr.ib(factory=dict)
+
+    def get(self, ccxml, device_pattern):
+        key = (pathlib.Path(ccxml).resolve(), device_pattern)
+
+        session = self.sessions.get(key)
+
+        if session is None:
+            session = self.environment.session(
+                ccxml=key[0],
+                device_pattern=device_pattern,
+            )
+            self.sessions[key] = session
+
+        return session
+
+    def discard(self, ccxml, device_pattern):
+        key = (pathlib.Path(ccxml).resolve(), device_pattern)
+        session = self.sessions.pop(key, None)
+
+        if session is not None:
+            self.environment.release(session)
+
+    def close(self):
+        self.sessions.clear()
+        self.environment.close_sessions()
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            request = json.loads(line.decode('utf-8'))
+
+            try:
+                result = self.server.dispatch(**request)
+            except Exception as e:
+                response = {'error': '{}: {}'.format(type(e).__name__, e)}
+            else:
+                response = {'result': result}
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class Server(socketserver.UnixStreamServer):
+    def __init__(self, path, environment):
+        self.sessions = Sessions(environment=environment)
+        self.ledger = ccstudiodss.ledger.Ledger()
+        super().__init__(ccstudiodss.utils.fspath(path), Handler)
+
+    def dispatch(self, command, **kwargs):
+        method = getattr(self, 'command_' + command, None)
+
+        if method is None:
+            raise DaemonError('Unknown command: {!r}'.format(command))
+
+        return method(**kwargs)
+
+    def with_session(self, ccxml, device_pattern, f):
+        session = self.sessions.get(
+            ccxml=ccxml,
+            device_pattern=device_pattern,
+        )
+
+        try:
+            return f(session)
+        except:
+            # the connection may be in an unknown state, reconnect next time
+            with contextlib.suppress(Exception):
+                self.sessions.discard(
+                    ccxml=ccxml,
+                    device_pattern=device_pattern,
+                )
+
+            raise
+
+    def command_ping(self):
+        return {'pid': os.getpid()}
+
+    def command_load(
+            self,
+            ccxml,
+            device_pattern,
+            binary,
+            timeout,
+            run,
+            skip_if_loaded=False,
+            region=None,
+            differential=False,
+            verify_sections=False,
+    ):
+        if region is not None:
+            region = ccstudiodss.ledger.Region(**region)
+
+        def load(session):
+            if differential:
+                result = attr.asdict(session.load_sections(
+                    binary=binary,
+                    timeout=timeout,
+                    ledger=self.ledger,
+                    verify=verify_sections,
+                ))
+            else:
+                result = {
+                    'loaded': session.load(
+                        binary=binary,
+                        timeout=timeout,
+                        ledger=self.ledger,
+                        skip_if_loaded=skip_if_loaded,
+                        region=region,
+                    ),
+                }
+
+            if run:
+                session.run()
+
+            return result
+
+        return self.with_session(
+            ccxml=ccxml,
+            device_pattern=device_pattern,
+            f=load,
+        )
+
+    def command_restart(self, ccxml, device_pattern):
+        def restart(session):
+            session.restart()
+
+        self.with_session(
+            ccxml=ccxml,
+            device_pattern=device_pattern,
+            f=restart,
+        )
+
+    def command_disconnect(self):
+        self.sessions.close()
+
+    def command_stop(self):
+        # shutdown() blocks until serve_forever() returns so it can not be
+        # called from the thread handling this request
+        threading.Thread(target=self.shutdown).start()
+
+
+def serve(path=None, base_path=None):
+    if path is None:
+        path = default_socket_path()
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if running_client(path=path) is not None:
+        raise DaemonError('Daemon already running at: {}'.format(
+            ccstudiodss.utils.fspath(path),
+        ))
+
+    if path.exists():
+        path.unlink()
+
+    ccstudiodss.api.add_jars(base_path=base_path)
+
+    try:
+        with ccstudiodss.api.Environment() as environment:
+            with Server(path=path, environment=environment) as server:
+                try:
+                    server.serve_forever()
+                finally:
+                    server.sessions.close()
+    finally:
+        if path.exists():
+            path.unlink()
+
+
+@attr.s
+class Client:
+    path = attr.ib(factory=default_socket_path)
+
+    def request(self, command, **kwargs):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(ccstudiodss.utils.fspath(self.path))
+
+            with s.makefile('rwb') as f:
+                request = dict(command=command, **kwargs)
+                f.write(json.dumps(request).encode('utf-8') + b'\n')
+                f.flush()
+                line = f.readline()
+
+        if len(line) == 0:
+            raise DaemonError('Daemon closed the connection')
+
+        response = json.loads(line.decode('utf-8'))
+
+        if 'error' in response:
+            raise DaemonError(response['error'])
+
+        return response['result']
+
+    def ping(self):
+        return self.request('ping')
+
+    def load(
+            self,
+            ccxml,
+            binary,
+            device_pattern='.*',
+            timeout=150,
+            run=True,
+            skip_if_loaded=False,
+            region=None,
+            differential=False,
+            verify_sections=False,
+    ):
+        if region is not None:
+            region = attr.asdict(region)
+
+        return self.request(
+            'load',
+            ccxml=ccstudiodss.utils.fspath(pathlib.Path(ccxml).resolve()),
+            device_pattern=device_pattern,
+            binary=ccstudiodss.utils.fspath(pathlib.Path(binary).resolve()),
+            timeout=timeout,
+            run=run,
+            skip_if_loaded=skip_if_loaded,
+            region=region,
+            differential=differential,
+            verify_sections=verify_sections,
+        )
+
+    def restart(self, ccxml, device_pattern='.*'):
+        return self.request(
+            'restart',
+            ccxml=ccstudiodss.utils.fspath(pathlib.Path(ccxml).resolve()),
+            device_pattern=device_pattern,
+        )
+
+    def disconnect(self):
+        return self.request('disconnect')
+
+    def stop(self):
+        return self.request('stop')
+
+
+def running_client(path=None):
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    if path is None:
+        path = default_socket_path()
+
+    client = Client(path=path)
+
+    try:
+        client.ping()
+    except (OSError, DaemonError):
+        return None
+
+    return client
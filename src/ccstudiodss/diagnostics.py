@@ -0,0 +1,204 @@
+import re
+import subprocess
+
+import attr
+
+
+errors = frozenset({'error', 'fatal error', 'INTERNAL ERROR'})
+
+# "../main.c", line 12: error #20: identifier "x" is undefined
+# "../main.c", line 12 (col. 5): warning #179-D: variable "y" was declared...
+ti_pattern = re.compile(
+    r'^"(?P<file>[^"]+)", line (?P<line>\d+)(?: \(col\. (?P<column>\d+)\))?:'
+    r' (?P<severity>fatal error|error|warning|remark|INTERNAL ERROR)'
+    r' #(?P<code>[\w-]+): ?(?P<message>.*)$',
+)
+
+# error #10056: symbol "x" redefined: first defined in "a.obj"
+ti_location_free_pattern = re.compile(
+    r'^\s*(?P<severity>fatal error|error|warning|remark)'
+    r' #(?P<code>[\w-]+): ?(?P<message>.*)$',
+)
+
+# main.c:12:5: error: use of undeclared identifier 'x'
+# as reported by the clang based TI Arm compiler
+clang_pattern = re.compile(
+    r'^(?P<file>(?:[A-Za-z]:)?[^:\s][^:]*):(?P<line>\d+):(?:(?P<column>\d+):)?'
+    r' (?P<severity>fatal error|error|warning|remark):'
+    r' (?P<message>.*?)(?: \[(?P<code>[^\]]+)\])?$',
+)
+
+# gmake: *** [all] Error 2
+make_pattern = re.compile(
+    r'^g?make(?:\[\d+\])?: \*\*\* (?P<message>.*Error \d+.*)$',
+)
+
+
+@attr.s(frozen=True)
+class Diagnostic:
+    severity = attr.ib()
+    message = attr.ib()
+    file = attr.ib(default=None)
+    line = attr.ib(default=None)
+    column = attr.ib(default=None)
+    code = attr.ib(default=None)
+    text = attr.ib(default=None, repr=False)
+
+    @property
+    def error(self):
+        return self.severity in errors
+
+    def __str__(self):
+        location = ':'.join(
+            str(part)
+            for part in (self.file, self.line, self.column)
+            if part is not None
+        )
+        code = '' if self.code is None else ' #{}'.format(self.code)
+        description = '{}{}: {}'.format(self.severity, code, self.message)
+
+        if location == '':
+            return description
+
+        return '{}: {}'.format(location, description)
+
+
+def optional_int(value):
+    return None if value is None else int(value)
+
+
+def parse_line(text):
+    """The Diagnostic reported on the output line text, or None."""
+
+    for pattern in (ti_pattern, clang_pattern):
+        match = pattern.match(text)
+        if match is not None:
+            return Diagnostic(
+                severity=match.group('severity'),
+                message=match.group('message'),
+                file=match.group('file'),
+                line=int(match.group('line')),
+                column=optional_int(match.group('column')),
+                code=match.group('code'),
+                text=text,
+            )
+
+    match = ti_location_free_pattern.match(text)
+    if match is not None:
+        return Diagnostic(
+            severity=match.group('severity'),
+            message=match.group('message'),
+            code=match.group('code'),
+            text=text,
+        )
+
+    match = make_pattern.match(text)
+    if match is not None:
+        return Diagnostic(
+            severity='error',
+            message=match.group('message'),
+            text=text,
+        )
+
+    return None
+
+
+def lines(stream):
+    """Yield the lines of a binary stream as they arrive, decoded."""
+
+    for line in iter(stream.readline, b''):
+        yield line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+
+def tee(lines, write):
+    """Pass each line to write before yielding it."""
+
+    for line in lines:
+        write(line)
+        yield line
+
+
+def parse(lines):
+    """Yield (line, diagnostic) pairs, diagnostic None for plain lines."""
+
+    for line in lines:
+        yield line, parse_line(line)
+
+
+class BuildError(subprocess.CalledProcessError):
+    """The build reported an error diagnostic and was stopped early."""
+
+    def __init__(self, returncode, cmd, diagnostic):
+        super().__init__(returncode=returncode, cmd=cmd)
+        self.diagnostic = diagnostic
+
+    def __str__(self):
+        return 'Build stopped at: {}'.format(self.diagnostic)
+
+
+def line_writer(output):
+    """A function writing lines to the binary file output or to stdout."""
+
+    if output is None:
+        def write(line):
+            print(line, flush=True)
+    else:
+        def write(line):
+            output.write(line.encode('utf-8') + b'\n')
+
+    return write
+
+
+def run(command, cwd=None, output=None, on_diagnostic=None, fail_fast=False):
+    """Run command streaming its output line by line.
+
+    Combined stdout and stderr lines are written to output, a binary file,
+    or to stdout when None.  Each recognized diagnostic is passed to
+    on_diagnostic as it arrives.  With fail_fast the process is terminated
+    at the first error diagnostic and BuildError raised.  Otherwise a
+    failing exit status raises subprocess.CalledProcessError as
+    subprocess.run(check=True) would.
+    """
+
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+
+    failure = None
+
+    with process:
+        try:
+            for _, diagnostic in parse(tee(
+                    lines(process.stdout),
+                    line_writer(output),
+            )):
+                if diagnostic is None:
+                    continue
+
+                if on_diagnostic is not None:
+                    on_diagnostic(diagnostic)
+
+                if fail_fast and diagnostic.error:
+                    failure = diagnostic
+                    process.terminate()
+                    break
+        except:
+            process.kill()
+
+            raise
+
+    if failure is not None:
+        raise BuildError(
+            returncode=process.returncode,
+            cmd=command,
+            diagnostic=failure,
+        )
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            returncode=process.returncode,
+            cmd=command,
+        )
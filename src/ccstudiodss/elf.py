@@ -0,0 +1,297 @@
+import contextlib
+import mmap
+import struct
+
+import attr
+
+
+class ElfError(Exception):
+    pass
+
+
+PT_LOAD = 1
+
+SHT_SYMTAB = 2
+SHT_NOBITS = 8
+
+SHF_ALLOC = 0x2
+
+STB_LOCAL = 0
+STB_GLOBAL = 1
+STB_WEAK = 2
+
+STT_NOTYPE = 0
+STT_OBJECT = 1
+STT_FUNC = 2
+STT_SECTION = 3
+STT_FILE = 4
+
+identification_size = 16
+
+header_formats = {
+    32: 'HHIIIIIHHHHHH',
+    64: 'HHIQQQIHHHHHH',
+}
+
+program_header_formats = {
+    32: 'IIIIIIII',
+    64: 'IIQQQQQQ',
+}
+
+section_header_formats = {
+    32: 'IIIIIIIIII',
+    64: 'IIQQQQIIQQ',
+}
+
+symbol_formats = {
+    32: 'IIIBBH',
+    64: 'IBBHQQ',
+}
+
+
+@attr.s(frozen=True)
+class Section:
+    name = attr.ib()
+    type = attr.ib()
+    flags = attr.ib()
+    address = attr.ib()
+    offset = attr.ib()
+    size = attr.ib()
+    link = attr.ib()
+    info = attr.ib()
+    entry_size = attr.ib()
+
+    @property
+    def loadable(self):
+        return (
+            self.flags & SHF_ALLOC != 0
+            and self.type != SHT_NOBITS
+            and self.size > 0
+        )
+
+
+@attr.s(frozen=True)
+class Segment:
+    type = attr.ib()
+    offset = attr.ib()
+    virtual_address = attr.ib()
+    physical_address = attr.ib()
+    file_size = attr.ib()
+    memory_size = attr.ib()
+
+    @property
+    def loadable(self):
+        return self.type == PT_LOAD and self.file_size > 0
+
+    def contains(self, section):
+        return (
+            self.offset <= section.offset
+            and section.offset + section.size <= self.offset + self.file_size
+        )
+
+
+@attr.s(frozen=True)
+class Symbol:
+    name = attr.ib()
+    address = attr.ib()
+    size = attr.ib()
+    type = attr.ib()
+    binding = attr.ib()
+    section_index = attr.ib()
+
+
+@attr.s
+class Elf:
+    """ELF sections and segments read from a buffer such as an mmap."""
+
+    buffer = attr.ib()
+    bits = attr.ib()
+    byte_order = attr.ib()
+    entry = attr.ib()
+    sections = attr.ib()
+    segments = attr.ib()
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        identification = buffer[:identification_size]
+
+        if identification[:4] != b'\x7fELF':
+            raise ElfError('Not an ELF file')
+
+        try:
+            bits = {1: 32, 2: 64}[identification[4]]
+            byte_order = {1: '<', 2: '>'}[identification[5]]
+        except KeyError:
+            raise ElfError('Unsupported ELF class or data encoding') from None
+
+        header_format = byte_order + header_formats[bits]
+        (
+            _type,
+            _machine,
+            _version,
+            entry,
+            program_header_offset,
+            section_header_offset,
+            _flags,
+            _header_size,
+            program_header_entry_size,
+            program_header_count,
+            section_header_entry_size,
+            section_header_count,
+            section_names_index,
+        ) = struct.unpack_from(header_format, buffer, identification_size)
+
+        program_header_format = byte_order + program_header_formats[bits]
+
+        segments = []
+
+        for index in range(program_header_count):
+            fields = struct.unpack_from(
+                program_header_format,
+                buffer,
+                program_header_offset + index * program_header_entry_size,
+            )
+
+            if bits == 32:
+                (
+                    type_,
+                    offset,
+                    virtual_address,
+                    physical_address,
+                    file_size,
+                    memory_size,
+                    _flags,
+                    _alignment,
+                ) = fields
+            else:
+                (
+                    type_,
+                    _flags,
+                    offset,
+                    virtual_address,
+                    physical_address,
+                    file_size,
+                    memory_size,
+                    _alignment,
+                ) = fields
+
+            segments.append(Segment(
+                type=type_,
+                offset=offset,
+                virtual_address=virtual_address,
+                physical_address=physical_address,
+                file_size=file_size,
+                memory_size=memory_size,
+            ))
+
+        section_header_format = byte_order + section_header_formats[bits]
+
+        headers = [
+            struct.unpack_from(
+                section_header_format,
+                buffer,
+                section_header_offset + index * section_header_entry_size,
+            )
+            for index in range(section_header_count)
+        ]
+
+        names_offset = headers[section_names_index][4]
+
+        sections = []
+
+        for (
+                name_offset,
+                type_,
+                flags,
+                address,
+                offset,
+                size,
+                link,
+                info,
+                _alignment,
+                entry_size,
+        ) in headers:
+            sections.append(Section(
+                name=read_string(buffer, names_offset + name_offset),
+                type=type_,
+                flags=flags,
+                address=address,
+                offset=offset,
+                size=size,
+                link=link,
+                info=info,
+                entry_size=entry_size,
+            ))
+
+        return cls(
+            buffer=buffer,
+            bits=bits,
+            byte_order=byte_order,
+            entry=entry,
+            sections=sections,
+            segments=segments,
+        )
+
+    def section_data(self, section):
+        return self.buffer[section.offset:section.offset + section.size]
+
+    def loadable_sections(self):
+        return [section for section in self.sections if section.loadable]
+
+    def segment_data(self, segment):
+        return self.buffer[segment.offset:segment.offset + segment.file_size]
+
+    def loadable_segments(self):
+        return [segment for segment in self.segments if segment.loadable]
+
+    def containing_segment(self, section):
+        """The loadable segment holding section, None if there is none."""
+
+        for segment in self.loadable_segments():
+            if segment.contains(section):
+                return segment
+
+        return None
+
+    def symbols(self):
+        symbol_format = struct.Struct(self.byte_order + symbol_formats[self.bits])
+
+        for table in self.sections:
+            if table.type != SHT_SYMTAB:
+                continue
+
+            names_offset = self.sections[table.link].offset
+
+            for offset in range(
+                    table.offset,
+                    table.offset + table.size,
+                    table.entry_size,
+            ):
+                fields = symbol_format.unpack_from(self.buffer, offset)
+
+                if self.bits == 32:
+                    name, address, size, info, _other, section_index = fields
+                else:
+                    name, info, _other, section_index, address, size = fields
+
+                yield Symbol(
+                    name=read_string(self.buffer, names_offset + name),
+                    address=address,
+                    size=size,
+                    type=info & 0xf,
+                    binding=info >> 4,
+                    section_index=section_index,
+                )
+
+
+def read_string(buffer, offset):
+    end = buffer.find(b'\x00', offset)
+
+    return buffer[offset:end].decode('utf-8', errors='replace')
+
+
+@contextlib.contextmanager
+def open_elf(path):
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield Elf.from_buffer(buffer)
@@ -0,0 +1,273 @@
+import json
+import os
+import pathlib
+import sys
+
+import attr
+
+import ccstudiodss.utils
+
+
+# bump when the index layout changes
+index_version = 1
+
+base_path_variable = 'CCSTUDIODSS_BASE_PATH'
+index_path_variable = 'CCSTUDIODSS_INSTALLATIONS'
+
+relative_jar_paths = tuple(
+    pathlib.Path(path)
+    for path in (
+        'DebugServer/packages/ti/dss/java/dss.jar',
+        (
+            'DebugServer/packages/ti/dss/java/'
+            'com.ti.ccstudio.scripting.environment_3.1.0.jar'
+        ),
+        'DebugServer/packages/ti/dss/java/com.ti.debug.engine_1.0.0.jar',
+        'dvt/scripting/dvt_scripting.jar',
+    )
+)
+
+
+def jar_paths(base_path, relative=relative_jar_paths):
+    base_path = pathlib.Path(base_path)
+    return tuple(
+        base_path / path
+        for path in relative
+    )
+
+
+def user_cache_path():
+    if sys.platform == 'win32':
+        root = os.environ.get('LOCALAPPDATA')
+    else:
+        root = os.environ.get('XDG_CACHE_HOME')
+
+    if root is None:
+        root = pathlib.Path.home() / '.cache'
+
+    return pathlib.Path(root) / 'ccstudiodss'
+
+
+def index_path():
+    path = os.environ.get(index_path_variable)
+
+    if path is None:
+        return user_cache_path() / 'installations.json'
+
+    return pathlib.Path(path)
+
+
+def roots(base_paths=None):
+    """Directories installations are made in, e.g. /opt/ti and ~/ti."""
+
+    if base_paths is None:
+        base_paths = ccstudiodss.utils.base_paths
+
+    found = []
+
+    for base_path in base_paths:
+        for parent in base_path.parents:
+            if parent.name == 'ti' and parent not in found:
+                found.append(parent)
+                break
+
+    return found
+
+
+def mtime(path):
+    try:
+        return pathlib.Path(path).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def read_version(base_path):
+    product = pathlib.Path(base_path).parent / 'eclipse' / '.eclipseproduct'
+
+    try:
+        with open(product) as f:
+            for line in f:
+                name, _, value = line.partition('=')
+                if name.strip() == 'version':
+                    return value.strip()
+    except OSError:
+        pass
+
+    return None
+
+
+@attr.s(frozen=True)
+class Installation:
+    base_path = attr.ib(converter=pathlib.Path)
+    executable = attr.ib()
+    jars = attr.ib(converter=tuple)
+    version = attr.ib()
+    mtime = attr.ib()
+
+    @classmethod
+    def from_base_path(cls, base_path):
+        base_path = pathlib.Path(base_path)
+
+        try:
+            executable = ccstudiodss.utils.find_executable(base_path=base_path)
+        except ccstudiodss.utils.ExecutablePathError:
+            executable = None
+
+        return cls(
+            base_path=base_path,
+            executable=executable,
+            jars=jar_paths(base_path=base_path),
+            version=read_version(base_path),
+            mtime=mtime(base_path),
+        )
+
+    def to_json(self):
+        return {
+            'base_path': ccstudiodss.utils.fspath(self.base_path),
+            'executable': (
+                None
+                if self.executable is None
+                else ccstudiodss.utils.fspath(self.executable)
+            ),
+            'jars': [ccstudiodss.utils.fspath(jar) for jar in self.jars],
+            'version': self.version,
+            'mtime': self.mtime,
+        }
+
+    @classmethod
+    def from_json(cls, installation):
+        executable = installation['executable']
+
+        return cls(
+            base_path=installation['base_path'],
+            executable=None if executable is None else pathlib.Path(executable),
+            jars=(pathlib.Path(jar) for jar in installation['jars']),
+            version=installation['version'],
+            mtime=installation['mtime'],
+        )
+
+    def require_executable(self):
+        if self.executable is None:
+            raise ccstudiodss.utils.ExecutablePathError(
+                'Executable not found for: {}'.format(
+                    ccstudiodss.utils.fspath(self.base_path),
+                ),
+            )
+
+        return self.executable
+
+
+@attr.s(frozen=True)
+class Index:
+    """Installations found in the known locations, in preference order.
+
+    The index is valid while the modification times of the installation
+    directories and the directories they are installed in are unchanged.
+    """
+
+    installations = attr.ib(converter=tuple)
+    roots = attr.ib()
+
+    @classmethod
+    def scan(cls):
+        return cls(
+            installations=(
+                Installation.from_base_path(base_path)
+                for base_path in ccstudiodss.utils.base_paths
+                if base_path.is_dir()
+            ),
+            roots={
+                ccstudiodss.utils.fspath(root): mtime(root)
+                for root in roots()
+            },
+        )
+
+    def valid(self):
+        return (
+            all(
+                mtime(root) == root_mtime
+                for root, root_mtime in self.roots.items()
+            )
+            and all(
+                mtime(installation.base_path) == installation.mtime
+                for installation in self.installations
+            )
+        )
+
+    def to_json(self):
+        return {
+            'version': index_version,
+            'installations': [
+                installation.to_json()
+                for installation in self.installations
+            ],
+            'roots': self.roots,
+        }
+
+    @classmethod
+    def from_json(cls, index):
+        if index.get('version') != index_version:
+            raise ValueError('Unsupported index version')
+
+        return cls(
+            installations=(
+                Installation.from_json(installation)
+                for installation in index['installations']
+            ),
+            roots=index['roots'],
+        )
+
+    def write(self, path):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with ccstudiodss.utils.atomic_write(path) as f:
+            json.dump(self.to_json(), f, indent=4)
+
+
+def load(refresh=False, path=None):
+    if path is None:
+        path = index_path()
+
+    if not refresh:
+        try:
+            with open(path) as f:
+                index = Index.from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        else:
+            if index.valid():
+                return index
+
+    index = Index.scan()
+
+    try:
+        index.write(path)
+    except OSError:
+        # the index is only an optimization
+        pass
+
+    return index
+
+
+def default():
+    """The installation to use, honoring $CCSTUDIODSS_BASE_PATH."""
+
+    base_path = os.environ.get(base_path_variable)
+
+    if base_path is not None:
+        return Installation.from_base_path(base_path)
+
+    installations = load().installations
+
+    if len(installations) == 0:
+        raise ccstudiodss.utils.BasePathError(
+            'Unable to find base path in: {}'.format(
+                ', '.join(
+                    repr(ccstudiodss.utils.fspath(path))
+                    for path in ccstudiodss.utils.base_paths
+                ),
+            ),
+        )
+
+    return installations[0]
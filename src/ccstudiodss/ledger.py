@@ -0,0 +1,109 @@
+import hashlib
+import json
+import pathlib
+
+import attr
+
+import ccstudiodss.elf
+import ccstudiodss.utils
+
+
+def default_path():
+    return ccstudiodss.utils.generated_path_root() / 'ledger.json'
+
+
+def section_record(section, data):
+    return {
+        'address': section.address,
+        'size': section.size,
+        'hash': hashlib.sha256(data).hexdigest(),
+    }
+
+
+def section_records(binary):
+    """Records of the loadable sections, None if binary is not ELF."""
+
+    try:
+        with ccstudiodss.elf.open_elf(binary) as elf:
+            return {
+                section.name: section_record(
+                    section=section,
+                    data=elf.section_data(section),
+                )
+                for section in elf.loadable_sections()
+            }
+    except ccstudiodss.elf.ElfError:
+        return None
+
+
+@attr.s(frozen=True)
+class Region:
+    """Target memory read back to confirm the recorded image is present."""
+
+    address = attr.ib()
+    count = attr.ib(default=8)
+    page = attr.ib(default=0)
+    type_size = attr.ib(default=16)
+
+
+@attr.s
+class Ledger:
+    """Record of the binary last loaded per ccxml and device pattern.
+
+    Entries are removed before a load starts and recorded once it completes
+    so an interrupted load never leaves a matching entry behind.
+    """
+
+    path = attr.ib(factory=default_path, converter=pathlib.Path)
+
+    @staticmethod
+    def key(ccxml, device_pattern):
+        return '{}|{}'.format(
+            ccstudiodss.utils.fspath(pathlib.Path(ccxml).resolve()),
+            device_pattern,
+        )
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write(self, entries):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with ccstudiodss.utils.atomic_write(self.path) as f:
+            json.dump(entries, f, indent=4, sort_keys=True)
+
+    def get(self, ccxml, device_pattern):
+        return self.read().get(self.key(ccxml, device_pattern))
+
+    def record(
+            self,
+            ccxml,
+            device_pattern,
+            binary_hash,
+            region=None,
+            values=None,
+            sections=None,
+    ):
+        entries = self.read()
+
+        entry = {'binary_hash': binary_hash}
+
+        if region is not None:
+            entry['region'] = attr.asdict(region)
+            entry['values'] = list(values)
+
+        if sections is not None:
+            entry['sections'] = sections
+
+        entries[self.key(ccxml, device_pattern)] = entry
+        self.write(entries)
+
+    def forget(self, ccxml, device_pattern):
+        entries = self.read()
+
+        if entries.pop(self.key(ccxml, device_pattern), None) is not None:
+            self.write(entries)
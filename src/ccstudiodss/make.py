@@ -0,0 +1,118 @@
+import os
+import pathlib
+
+import ccstudiodss.diagnostics
+import ccstudiodss.utils
+
+
+class MakePathError(Exception):
+    pass
+
+
+def find_gmake(base_path):
+    candidates = [
+        pathlib.Path(base_path).parents[0]/'utils'/'bin'/file_name
+        for file_name in ('gmake.exe', 'gmake')
+    ]
+
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+
+    raise MakePathError('gmake not found in: {}'.format(
+        ', '.join(repr(ccstudiodss.utils.fspath(candidate)) for candidate in candidates)
+    ))
+
+
+def project_mtime(project_root, excluded_directories=()):
+    """The latest modification of the project settings or its layout.
+
+    Directory modification times change when files are added, removed or
+    renamed, which also requires regenerating the makefiles.  Edits to
+    existing sources do not and are left to make.
+    """
+
+    project_root = pathlib.Path(project_root)
+    settings = project_root / '.settings'
+
+    latest = max(
+        (project_root / name).stat().st_mtime_ns
+        for name in ('.project', '.cproject')
+    )
+
+    for directory, file_names in ccstudiodss.utils.walk_project(
+            project_root=project_root,
+            excluded_directories=excluded_directories,
+    ):
+        latest = max(latest, directory.stat().st_mtime_ns)
+
+        if directory == settings:
+            for name in file_names:
+                latest = max(latest, (directory / name).stat().st_mtime_ns)
+
+    return latest
+
+
+def makefile_path(build_directory):
+    return pathlib.Path(build_directory) / 'makefile'
+
+
+def makefiles_current(project_root, build_directory, excluded_directories=()):
+    """Whether the makefiles in build_directory are newer than the project.
+
+    build_directory is the configuration's output directory where CCS
+    generates the makefiles.
+    """
+
+    makefile = makefile_path(build_directory=build_directory)
+
+    try:
+        makefile_mtime = makefile.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+    return makefile_mtime >= project_mtime(
+        project_root=project_root,
+        excluded_directories=excluded_directories,
+    )
+
+
+def goals(build_type):
+    return {
+        'incremental': [['all']],
+        'full': [['clean'], ['all']],
+        'clean': [['clean']],
+    }[build_type.name]
+
+
+def build(
+        build_directory,
+        build_type,
+        base_path,
+        jobs=None,
+        output=None,
+        on_diagnostic=None,
+        fail_fast=False,
+):
+    """Run the CCS generated makefiles in build_directory with the CCS gmake.
+
+    Output is streamed as by ccstudiodss.diagnostics.run().
+    """
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    gmake = find_gmake(base_path=base_path)
+
+    for goal in goals(build_type):
+        ccstudiodss.diagnostics.run(
+            [
+                ccstudiodss.utils.fspath(gmake),
+                '-j', str(jobs),
+                *goal,
+            ],
+            cwd=ccstudiodss.utils.fspath(build_directory),
+            output=output,
+            on_diagnostic=on_diagnostic,
+            fail_fast=fail_fast,
+        )
@@ -0,0 +1,178 @@
+import pathlib
+
+import attr
+
+import ccstudiodss.utils
+
+
+class ProjectNotFoundError(Exception):
+    pass
+
+
+class DependencyCycleError(Exception):
+    pass
+
+
+def read_description(project_root):
+    import lxml.etree
+
+    return lxml.etree.parse(
+        ccstudiodss.utils.fspath(pathlib.Path(project_root) / '.project'),
+    ).getroot()
+
+
+def read_name(project_root):
+    """The project name recorded in the Eclipse .project file."""
+
+    return read_description(project_root).findtext('name').strip()
+
+
+def read_references(project_root):
+    """The names of the projects referenced in the .project file."""
+
+    return [
+        element.text.strip()
+        for element in read_description(project_root).findall(
+            'projects/project',
+        )
+        if element.text is not None and element.text.strip() != ''
+    ]
+
+
+@attr.s(frozen=True)
+class Project:
+    name = attr.ib()
+    root = attr.ib(converter=pathlib.Path)
+    references = attr.ib(converter=tuple, default=())
+
+    @classmethod
+    def from_root(cls, root):
+        return cls(
+            name=read_name(root),
+            root=root,
+            references=read_references(root),
+        )
+
+
+def find_projects(search_paths):
+    """Map project names to roots for the projects in search_paths.
+
+    Each search path is checked itself and for projects in its immediate
+    subdirectories, matching the usual workspace layout.  Earlier paths
+    take precedence.
+    """
+
+    found = {}
+
+    for search_path in search_paths:
+        search_path = pathlib.Path(search_path)
+
+        if not search_path.is_dir():
+            continue
+
+        candidates = [search_path, *sorted(search_path.iterdir())]
+
+        for candidate in candidates:
+            if (candidate / '.project').is_file():
+                found.setdefault(read_name(candidate), candidate)
+
+    return found
+
+
+def dependency_graph(project_roots, search_paths=()):
+    """The projects at project_roots and those they reference, by name.
+
+    Referenced projects are looked up in search_paths and then next to the
+    given projects.  Only .project references are followed, per
+    configuration references in .cproject files are not.
+    """
+
+    project_roots = [pathlib.Path(root) for root in project_roots]
+    projects = {}
+    pending = []
+
+    for root in project_roots:
+        project = Project.from_root(root)
+        projects[project.name] = project
+        pending.append(project)
+
+    available = None
+
+    while len(pending) > 0:
+        project = pending.pop()
+
+        for name in project.references:
+            if name in projects:
+                continue
+
+            if available is None:
+                available = find_projects([
+                    *search_paths,
+                    *sorted({root.parent for root in project_roots}),
+                ])
+
+            root = available.get(name)
+            if root is None:
+                raise ProjectNotFoundError(
+                    'Project {!r} referenced by {!r} not found'.format(
+                        name,
+                        project.name,
+                    ),
+                )
+
+            referenced = Project.from_root(root)
+            projects[name] = referenced
+            pending.append(referenced)
+
+    return projects
+
+
+def referenced_projects(projects, name):
+    """The projects name references directly or indirectly, in build order."""
+
+    referenced = set()
+    pending = [name]
+
+    while len(pending) > 0:
+        for reference in projects[pending.pop()].references:
+            if reference not in referenced:
+                referenced.add(reference)
+                pending.append(reference)
+
+    return [
+        projects[other]
+        for other in topological_order(projects)
+        if other in referenced
+    ]
+
+
+def topological_order(projects):
+    """Project names ordered so each follows the projects it references."""
+
+    order = []
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+
+        if state.get(name) == 'visiting':
+            cycle = [*path[path.index(name):], name]
+            raise DependencyCycleError(
+                'Project references form a cycle: {}'.format(
+                    ' -> '.join(cycle),
+                ),
+            )
+
+        state[name] = 'visiting'
+
+        for reference in projects[name].references:
+            visit(reference, [*path, name])
+
+        state[name] = 'done'
+        order.append(name)
+
+    for name in sorted(projects):
+        visit(name, [])
+
+    return order
@@ -1,28 +1,75 @@
 import pytest
 
 import ccstudiodss.api
-import ccstudiodss.utils
 
 
-@pytest.fixture
-def ccstudiodss_session(pytestconfig):
-    ccxml = pytestconfig.getoption('ccxml')
+@pytest.fixture(scope='session')
+def ccstudiodss_connection(pytestconfig):
+    """Connect once per test run.
+
+    JPype is unable to restart the JVM within a process so the session is
+    shared by all tests rather than reconnected for each.
+    """
+
+    session = ccstudiodss.api.Session(
+        ccxml=pytestconfig.getoption('ccxml'),
+        device_pattern=pytestconfig.getoption('device_pattern'),
+    )
+
+    with session:
+        binary = pytestconfig.getoption('binary')
+        if binary is not None:
+            session.load(binary=binary)
 
-    with ccstudiodss.api.Session(ccxml=ccxml) as session:
         yield session
 
 
+@pytest.fixture
+def ccstudiodss_reset(pytestconfig):
+    """Return the callable used to prepare the shared session for each test.
+
+    Override this fixture to customize the per-test preparation.
+    """
+
+    binary = pytestconfig.getoption('binary')
+    reload = pytestconfig.getoption('reload_binary')
+
+    def reset(session):
+        session.reset()
+
+        if reload and binary is not None:
+            session.load(binary=binary)
+
+    return reset
+
+
+@pytest.fixture
+def ccstudiodss_session(ccstudiodss_connection, ccstudiodss_reset):
+    ccstudiodss_reset(ccstudiodss_connection)
+
+    yield ccstudiodss_connection
+
+
 def pytest_addoption(parser):
     group = parser.getgroup('ccstudiodss')
 
     group.addoption('--ccs-base-path')
     group.addoption('--ccxml')
+    group.addoption(
+        '--device-pattern',
+        default='.*',
+        help='Regex pattern used to select the device/core',
+    )
+    group.addoption(
+        '--binary',
+        help='.out embedded binary file loaded when connecting',
+    )
+    group.addoption(
+        '--reload-binary',
+        action='store_true',
+        help='Reload the binary before each test rather than only resetting',
+    )
 
 
 def pytest_configure(config):
-    base_path = config.getoption('ccs_base_path')
-
-    if base_path is None:
-        base_path = ccstudiodss.utils.find_base_path()
-
-    ccstudiodss.api.add_jars(base_path=base_path)
+    ccstudiodss.api.add_jars(base_path=config.getoption('ccs_base_path'))
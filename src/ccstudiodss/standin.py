@@ -0,0 +1,456 @@
+"""A pure Python stand-in for the parts of DSS used by ccstudiodss.
+
+The objects mimic the Java ScriptingEnvironment, DebugServer, DebugSession,
+Target, Memory and Symbol APIs closely enough to drive
+ccstudiodss.api.Session without a JVM, CCS install or hardware.  Each
+operation sleeps for a configurable latency so benchmarks can model a real
+setup while measuring the Python side overhead.
+"""
+
+import array
+import os
+import sys
+import threading
+import time
+
+import attr
+
+import ccstudiodss.elf
+
+
+class StandInError(Exception):
+    pass
+
+
+@attr.s(frozen=True)
+class Latencies:
+    """Seconds spent in each operation, all zero by default."""
+
+    start = attr.ib(default=0)
+    scripting_environment = attr.ib(default=0)
+    set_config = attr.ib(default=0)
+    open_session = attr.ib(default=0)
+    connect = attr.ib(default=0)
+    disconnect = attr.ib(default=0)
+    load_program = attr.ib(default=0)
+    load_per_byte = attr.ib(default=0)
+    memory_transaction = attr.ib(default=0)
+    memory_per_value = attr.ib(default=0)
+    reset = attr.ib(default=0)
+    restart = attr.ib(default=0)
+    run = attr.ib(default=0)
+
+
+def sleep(seconds):
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+value_formats = {8: 'B', 16: 'H', 32: 'I', 64: 'Q'}
+
+
+def widen(data, type_size):
+    """Unsigned type_size bit values in data as signed 64 bit values."""
+
+    values = memoryview(data).cast(value_formats[type_size])
+
+    if type_size == 64:
+        return values.cast('B').cast('q')
+
+    return values
+
+
+def narrow(values, type_size):
+    """The low type_size bits of each value as native byte order bytes.
+
+    Values in an int64 buffer are narrowed by slicing bytes rather than
+    value by value.
+    """
+
+    width = type_size // 8
+
+    try:
+        view = memoryview(values).cast('B')
+    except TypeError:
+        view = None
+
+    if (
+            view is None
+            or len(view) != 8 * len(values)
+            or sys.byteorder != 'little'
+    ):
+        mask = (1 << type_size) - 1
+
+        return array.array(
+            value_formats[type_size],
+            (int(value) & mask for value in values),
+        )
+
+    result = bytearray(width * len(values))
+    for index in range(width):
+        result[index::width] = view[index::8]
+
+    return result
+
+
+@attr.s
+class Memory:
+    """Sparse target memory of address_unit_bits wide address units."""
+
+    latencies = attr.ib()
+    address_unit_bits = attr.ib(default=16)
+    chunk_size = attr.ib(default=0x10000)
+    pages = attr.ib(factory=dict)
+    loaded = attr.ib(default=None)
+    target = attr.ib(default=None, repr=False)
+
+    def require_connected(self):
+        if self.target is not None:
+            self.target.require_connected()
+
+    def chunks(self, page):
+        return self.pages.setdefault(page, {})
+
+    def read_bytes(self, page, offset, length):
+        chunks = self.chunks(page)
+        result = bytearray(length)
+        position = 0
+
+        while position < length:
+            index, chunk_offset = divmod(offset + position, self.chunk_size)
+            count = min(self.chunk_size - chunk_offset, length - position)
+            chunk = chunks.get(index)
+
+            if chunk is not None:
+                result[position:position + count] = (
+                    chunk[chunk_offset:chunk_offset + count]
+                )
+
+            position += count
+
+        return result
+
+    def write_bytes(self, page, offset, data):
+        chunks = self.chunks(page)
+        data = memoryview(data).cast('B')
+        position = 0
+
+        while position < len(data):
+            index, chunk_offset = divmod(offset + position, self.chunk_size)
+            count = min(self.chunk_size - chunk_offset, len(data) - position)
+            chunk = chunks.setdefault(index, bytearray(self.chunk_size))
+            chunk[chunk_offset:chunk_offset + count] = (
+                data[position:position + count]
+            )
+            position += count
+
+    def byte_offset(self, address):
+        return address * self.address_unit_bits // 8
+
+    def readData(self, page, address, typeSize, numValues, signed=False):
+        self.require_connected()
+        sleep(
+            self.latencies.memory_transaction
+            + numValues * self.latencies.memory_per_value
+        )
+
+        data = self.read_bytes(
+            page=page,
+            offset=self.byte_offset(address),
+            length=numValues * typeSize // 8,
+        )
+
+        # a buffer of int64 like the long[] returned by DSS through JPype
+        return array.array('q', widen(data=data, type_size=typeSize))
+
+    def writeData(self, page, address, values, typeSize):
+        self.require_connected()
+        sleep(
+            self.latencies.memory_transaction
+            + len(values) * self.latencies.memory_per_value
+        )
+
+        self.write_bytes(
+            page=page,
+            offset=self.byte_offset(address),
+            data=narrow(values=values, type_size=typeSize),
+        )
+
+    def loadProgram(self, path):
+        self.require_connected()
+        sleep(
+            self.latencies.load_program
+            + os.path.getsize(path) * self.latencies.load_per_byte
+        )
+
+        try:
+            with ccstudiodss.elf.open_elf(path) as elf:
+                # like DSS, load the segments at their physical addresses
+                for segment in elf.loadable_segments():
+                    self.write_bytes(
+                        page=0,
+                        offset=self.byte_offset(segment.physical_address),
+                        data=elf.segment_data(segment),
+                    )
+        except ccstudiodss.elf.ElfError:
+            pass
+
+        self.loaded = path
+
+
+@attr.s
+class Symbol:
+    loaded = attr.ib(default=None)
+
+    def load(self, path):
+        self.loaded = path
+
+
+@attr.s
+class Breakpoints:
+    locations = attr.ib(factory=dict)
+    next_id = attr.ib(default=0)
+
+    def add(self, location):
+        self.next_id += 1
+        self.locations[self.next_id] = location
+
+        return self.next_id
+
+    def remove(self, id):
+        del self.locations[id]
+
+    def removeAll(self):
+        self.locations.clear()
+
+
+@attr.s
+class Target:
+    """A target that halts latencies.run seconds after it starts running."""
+
+    latencies = attr.ib()
+    environment = attr.ib(repr=False)
+    server = attr.ib(default=None, repr=False)
+    connected = attr.ib(default=False)
+    halted = attr.ib(default=True)
+
+    def require_connected(self):
+        if not self.connected:
+            raise StandInError('Target is not connected')
+
+    def connect(self):
+        sleep(self.latencies.connect)
+
+        if self.server is not None and self.server.failing_connects > 0:
+            self.server.failing_connects -= 1
+            raise StandInError('Unable to connect to the target')
+
+        self.connected = True
+
+    def disconnect(self):
+        sleep(self.latencies.disconnect)
+        self.connected = False
+
+    def isConnected(self):
+        return self.connected
+
+    def isHalted(self):
+        return self.halted
+
+    def reset(self):
+        self.require_connected()
+        sleep(self.latencies.reset)
+        self.halted = True
+
+    def restart(self):
+        self.require_connected()
+        sleep(self.latencies.restart)
+        self.halted = True
+
+    def runAsynch(self):
+        self.require_connected()
+        self.halted = False
+
+    def run(self):
+        self.runAsynch()
+        self.waitForHalt()
+
+    def halt(self):
+        self.require_connected()
+        self.halted = True
+
+    def waitForHalt(self):
+        self.require_connected()
+
+        if self.halted:
+            return
+
+        timeout = self.environment.timeout / 1000
+
+        if 0 < timeout < self.latencies.run:
+            sleep(timeout)
+            raise StandInError('Timed out waiting for the target to halt')
+
+        sleep(self.latencies.run)
+        self.halted = True
+
+
+@attr.s
+class DebugSession:
+    target = attr.ib()
+    memory = attr.ib()
+    symbol = attr.ib(factory=Symbol)
+    breakpoint = attr.ib(factory=Breakpoints)
+    terminated = attr.ib(default=False)
+
+    def terminate(self):
+        self.terminated = True
+
+
+@attr.s
+class Simultaneous:
+    """Run and halt several sessions of one debug server together."""
+
+    def run(self, sessions):
+        for session in sessions:
+            session.target.require_connected()
+
+        for session in sessions:
+            session.target.halted = False
+
+    def halt(self, sessions):
+        for session in sessions:
+            session.target.halt()
+
+
+@attr.s
+class DebugServer:
+    latencies = attr.ib()
+    environment = attr.ib(repr=False)
+    address_unit_bits = attr.ib(default=16)
+    config = attr.ib(default=None)
+    sessions = attr.ib(factory=list)
+    memories = attr.ib(factory=dict)
+    failing_connects = attr.ib(default=0)
+    simultaneous = attr.ib(factory=Simultaneous)
+
+    def setConfig(self, path):
+        sleep(self.latencies.set_config)
+        self.config = path
+
+    def openSession(self, pattern):
+        if self.config is None:
+            raise StandInError('No configuration set')
+
+        sleep(self.latencies.open_session)
+
+        target = Target(
+            latencies=self.latencies,
+            environment=self.environment,
+            server=self,
+        )
+        session = DebugSession(
+            target=target,
+            memory=Memory(
+                latencies=self.latencies,
+                address_unit_bits=self.address_unit_bits,
+                # target memory outlives the debug session
+                pages=self.memories.setdefault(pattern, {}),
+                target=target,
+            ),
+        )
+        self.sessions.append(session)
+
+        return session
+
+    def drop(self, failing_connects=0):
+        """Simulate a lost emulator link.
+
+        All targets are disconnected and the next failing_connects connect
+        attempts fail.
+        """
+
+        for session in self.sessions:
+            session.target.connected = False
+
+        self.failing_connects = failing_connects
+
+    def stop(self):
+        self.sessions.clear()
+        self.config = None
+
+
+@attr.s
+class ScriptingEnvironment:
+    latencies = attr.ib()
+    address_unit_bits = attr.ib(default=16)
+    timeout = attr.ib(default=-1)
+    servers = attr.ib(factory=dict)
+
+    def getServer(self, name):
+        server = self.servers.get(name)
+
+        if server is None:
+            server = DebugServer(
+                latencies=self.latencies,
+                environment=self,
+                address_unit_bits=self.address_unit_bits,
+            )
+            self.servers[name] = server
+
+        return server
+
+    def getScriptTimeout(self):
+        return self.timeout
+
+    def setScriptTimeout(self, timeout):
+        self.timeout = timeout
+
+
+@attr.s
+class StandInBackend:
+    """A Session backend using the stand-in objects in place of DSS."""
+
+    latencies = attr.ib(factory=Latencies)
+    address_unit_bits = attr.ib(default=16)
+    environment = attr.ib(default=None)
+
+    def start(self):
+        if self.environment is None:
+            sleep(self.latencies.start)
+            self.environment = ScriptingEnvironment(
+                latencies=self.latencies,
+                address_unit_bits=self.address_unit_bits,
+            )
+
+    def stop(self):
+        # as JPype does for shutting down the JVM
+        if threading.current_thread() is not threading.main_thread():
+            raise StandInError('Shutdown must be called from main thread')
+
+        self.environment = None
+
+    def attach_thread(self):
+        pass
+
+    def scripting_environment(self):
+        if self.environment is None:
+            raise StandInError('Backend is not started')
+
+        sleep(self.latencies.scripting_environment)
+
+        return self.environment
+
+    def long_array(self, values):
+        try:
+            view = memoryview(values)
+        except TypeError:
+            return array.array('q', values)
+
+        result = array.array('q')
+        result.frombytes(view.cast('B'))
+
+        return result
+
+    def session_array(self, debug_sessions):
+        return list(debug_sessions)
@@ -0,0 +1,176 @@
+import bisect
+import itertools
+import json
+import pathlib
+
+import attr
+
+import ccstudiodss.elf
+import ccstudiodss.utils
+
+
+# bump when the cache file layout changes
+cache_version = 1
+
+skipped_types = (ccstudiodss.elf.STT_SECTION, ccstudiodss.elf.STT_FILE)
+
+binding_preference = {
+    ccstudiodss.elf.STB_GLOBAL: 0,
+    ccstudiodss.elf.STB_WEAK: 1,
+    ccstudiodss.elf.STB_LOCAL: 2,
+}
+
+
+@attr.s(frozen=True)
+class Symbol:
+    name = attr.ib()
+    address = attr.ib()
+    size = attr.ib()
+    type = attr.ib()
+    binding = attr.ib()
+
+
+@attr.s
+class SymbolIndex:
+    """Name and address lookups over the symbol table of a binary.
+
+    When several symbols share a name, such as file local statics, the
+    global one is found by name.
+    """
+
+    symbols = attr.ib(converter=tuple)
+    by_name = attr.ib(init=False, repr=False)
+    by_address = attr.ib(init=False, repr=False)
+    addresses = attr.ib(init=False, repr=False)
+    ends = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self.by_name = {}
+
+        for symbol in sorted(
+                self.symbols,
+                key=lambda symbol: binding_preference.get(symbol.binding, 3),
+                reverse=True,
+        ):
+            self.by_name[symbol.name] = symbol
+
+        # zero size untyped symbols such as ARM mapping symbols ($d, $t)
+        # and linker markers label a location rather than cover it
+        self.by_address = sorted(
+            (
+                symbol
+                for symbol in self.symbols
+                if symbol.size > 0 or symbol.type != ccstudiodss.elf.STT_NOTYPE
+            ),
+            key=lambda symbol: (symbol.address, symbol.size),
+        )
+        self.addresses = [symbol.address for symbol in self.by_address]
+        # the furthest end of any symbol up to each position
+        self.ends = list(itertools.accumulate(
+            (
+                symbol.address + max(symbol.size, 1)
+                for symbol in self.by_address
+            ),
+            max,
+        ))
+
+    @classmethod
+    def from_elf(cls, elf):
+        return cls(
+            symbols=(
+                Symbol(
+                    name=symbol.name,
+                    address=symbol.address,
+                    size=symbol.size,
+                    type=symbol.type,
+                    binding=symbol.binding,
+                )
+                for symbol in elf.symbols()
+                if symbol.name != '' and symbol.type not in skipped_types
+            ),
+        )
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def get(self, name, default=None):
+        return self.by_name.get(name, default)
+
+    def at(self, address):
+        """The symbol containing address, None if there is none."""
+
+        index = bisect.bisect_right(self.addresses, address)
+
+        # search towards lower addresses while an earlier symbol may still
+        # extend past address, the largest of those sharing an address first
+        while index > 0 and self.ends[index - 1] > address:
+            index -= 1
+            symbol = self.by_address[index]
+
+            if address < symbol.address + max(symbol.size, 1):
+                return symbol
+
+        return None
+
+    def to_json(self):
+        return [attr.astuple(symbol) for symbol in self.symbols]
+
+    @classmethod
+    def from_json(cls, symbols):
+        return cls(symbols=(Symbol(*symbol) for symbol in symbols))
+
+
+def cache_path(binary):
+    binary = pathlib.Path(binary)
+
+    return binary.with_name(binary.name + '.symbols.json')
+
+
+def load(binary):
+    """Load the symbol index of binary, parsing it only if not cached.
+
+    The index is cached in a file next to the binary keyed by the binary's
+    hash.
+    """
+
+    binary_hash = ccstudiodss.utils.binary_hash(binary)
+    path = cache_path(binary)
+
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+
+    if (
+            cached.get('version') == cache_version
+            and cached.get('binary_hash') == binary_hash
+    ):
+        return SymbolIndex.from_json(cached['symbols'])
+
+    with ccstudiodss.elf.open_elf(binary) as elf:
+        index = SymbolIndex.from_elf(elf)
+
+    try:
+        write_cache(
+            path=path,
+            cached={
+                'version': cache_version,
+                'binary_hash': binary_hash,
+                'symbols': index.to_json(),
+            },
+        )
+    except OSError:
+        # the cache is only an optimization, e.g. the directory may be read
+        # only
+        pass
+
+    return index
+
+
+def write_cache(path, cached):
+    with ccstudiodss.utils.atomic_write(path) as f:
+        json.dump(cached, f)
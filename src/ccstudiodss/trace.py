@@ -0,0 +1,110 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+import attr
+
+import ccstudiodss.utils
+
+
+hooks = []
+
+
+def add_hook(hook):
+    """Call hook with each Span as it ends."""
+
+    hooks.append(hook)
+
+
+def remove_hook(hook):
+    hooks.remove(hook)
+
+
+@attr.s(frozen=True)
+class Span:
+    name = attr.ib()
+    start = attr.ib()
+    end = attr.ib()
+    thread = attr.ib()
+    arguments = attr.ib(factory=dict)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+@contextlib.contextmanager
+def span(name, **arguments):
+    """Time the enclosed block and report it to the hooks.
+
+    Times are time.perf_counter() seconds.  Nothing is recorded when there
+    are no hooks.
+    """
+
+    if len(hooks) == 0:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        finished = Span(
+            name=name,
+            start=start,
+            end=time.perf_counter(),
+            thread=threading.get_ident(),
+            arguments=arguments,
+        )
+
+        for hook in list(hooks):
+            hook(finished)
+
+
+@attr.s
+class ChromeTrace:
+    """Collect spans as Chrome trace event format complete events."""
+
+    events = attr.ib(factory=list)
+    lock = attr.ib(factory=threading.Lock, repr=False)
+
+    def __call__(self, span):
+        event = {
+            'name': span.name,
+            'ph': 'X',
+            'ts': span.start * 1e6,
+            'dur': span.duration * 1e6,
+            'pid': os.getpid(),
+            'tid': span.thread,
+            'args': {
+                name: str(value)
+                for name, value in span.arguments.items()
+            },
+        }
+
+        with self.lock:
+            self.events.append(event)
+
+    def write(self, path):
+        with self.lock:
+            events = list(self.events)
+
+        with open(ccstudiodss.utils.fspath(path), 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+@contextlib.contextmanager
+def recording(path):
+    """Record spans while the context is active and write them to path."""
+
+    trace = ChromeTrace()
+    add_hook(trace)
+
+    try:
+        yield trace
+    finally:
+        remove_hook(trace)
+        trace.write(path)
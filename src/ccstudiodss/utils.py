@@ -1,3 +1,4 @@
+import contextlib
 import hashlib
 import itertools
 import os
@@ -59,9 +60,12 @@ def find_base_path():
     ))
 
 
-def find_executable():
+def find_executable(base_path=None):
+    if base_path is None:
+        base_path = find_base_path()
+
     candidates = [
-        find_base_path().parents[0]/'eclipse'/file_name
+        pathlib.Path(base_path).parents[0]/'eclipse'/file_name
         for file_name in ('eclipsec.exe', 'ccstudio')
     ]
 
@@ -74,6 +78,76 @@ def find_executable():
     ))
 
 
+@contextlib.contextmanager
+def atomic_write(path, mode='w'):
+    """Open a temporary file beside path which replaces path when done.
+
+    Readers never see a partial file and on error path is left untouched.
+    """
+
+    path = pathlib.Path(path)
+
+    file_descriptor, temporary = tempfile.mkstemp(
+        prefix='.' + path.name + '-',
+        dir=fspath(path.parent),
+    )
+
+    try:
+        with open(file_descriptor, mode) as f:
+            yield f
+
+        os.replace(temporary, fspath(path))
+    except:
+        os.remove(temporary)
+
+        raise
+
+
+def file_hash(path):
+    hasher = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(2**16), b''):
+            hasher.update(chunk)
+
+    return hasher.digest()
+
+
+def binary_hash(binary):
+    return file_hash(binary).hex()
+
+
+# hidden directories that hold project settings rather than tool state
+included_hidden_directories = ('.settings',)
+
+
+def walk_project(project_root, excluded_directories=()):
+    """Yield the project directories and their file names in a stable order.
+
+    Hidden directories other than those holding project settings and the
+    top level excluded_directories, such as configuration outputs, are
+    skipped.
+    """
+
+    project_root = pathlib.Path(project_root)
+    excluded_directories = set(excluded_directories)
+
+    for directory, directory_names, file_names in os.walk(project_root):
+        directory = pathlib.Path(directory)
+        top = directory == project_root
+
+        directory_names[:] = sorted(
+            name
+            for name in directory_names
+            if (
+                (not name.startswith('.') or name in included_hidden_directories)
+                and not (top and name in excluded_directories)
+            )
+        )
+
+        yield directory, sorted(file_names)
+
+
 def generated_path_root():
     return pathlib.Path(tempfile.gettempdir())/__name__.partition('.')[0]
 
@@ -0,0 +1,133 @@
+import contextlib
+import os
+import pathlib
+import time
+
+import attr
+
+import ccstudiodss.utils
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class WorkspaceTimeoutError(Exception):
+    pass
+
+
+def default_size():
+    return os.cpu_count() or 1
+
+
+def pool_path(project_root, suffix=None):
+    return ccstudiodss.utils.generated_project_root(
+        project_root=project_root,
+        suffix=suffix,
+    ) / 'pool'
+
+
+def try_lock(f):
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+
+    return True
+
+
+def unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@attr.s(frozen=True)
+class Slot:
+    path = attr.ib(converter=pathlib.Path)
+
+    @property
+    def workspace(self):
+        return self.path / 'workspace'
+
+    @property
+    def marker(self):
+        return self.path / 'imported'
+
+    def imported_projects(self):
+        try:
+            return self.marker.read_text(encoding='utf-8').splitlines()
+        except FileNotFoundError:
+            return []
+
+    def imported(self, project_name):
+        return project_name in self.imported_projects()
+
+    def mark_imported(self, project_name):
+        names = self.imported_projects()
+
+        if project_name not in names:
+            self.marker.write_text(
+                '\n'.join([*names, project_name]),
+                encoding='utf-8',
+            )
+
+    def forget_imported(self):
+        if self.marker.exists():
+            self.marker.unlink()
+
+
+@contextlib.contextmanager
+def lease(project_root, suffix=None, size=None, timeout=None, poll=0.5):
+    """Lease a workspace slot from the project's pool.
+
+    Slots are locked with an OS file lock held for the duration of the
+    lease so concurrent processes never share a workspace, and a lock held
+    by a crashed process is released by the OS.  Slots are created on
+    demand up to size.  When all are leased this waits, raising
+    WorkspaceTimeoutError after timeout seconds if given.
+    """
+
+    if size is None:
+        size = default_size()
+
+    root = pool_path(project_root=project_root, suffix=suffix)
+
+    if timeout is None:
+        deadline = None
+    else:
+        deadline = time.monotonic() + timeout
+
+    while True:
+        for index in range(size):
+            slot = Slot(path=root / str(index))
+            slot.path.mkdir(parents=True, exist_ok=True)
+
+            with open(slot.path / 'lock', 'a+b') as f:
+                if not try_lock(f):
+                    continue
+
+                try:
+                    slot.workspace.mkdir(exist_ok=True)
+
+                    yield slot
+                finally:
+                    unlock(f)
+
+                return
+
+        if deadline is not None and time.monotonic() > deadline:
+            raise WorkspaceTimeoutError(
+                'No workspace available in: {}'.format(
+                    ccstudiodss.utils.fspath(root),
+                ),
+            )
+
+        time.sleep(poll)